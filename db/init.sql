@@ -49,6 +49,14 @@ CREATE TABLE inventory (
     quantity INTEGER NOT NULL DEFAULT 0,
     reorder_point INTEGER DEFAULT 50,
     max_capacity INTEGER DEFAULT 1000,
+    -- Stock bucket kept in sync by Postgres so readers never recompute it per row
+    stock_status VARCHAR(20) GENERATED ALWAYS AS (
+        CASE
+            WHEN quantity <= reorder_point THEN 'low'
+            WHEN quantity >= max_capacity * 0.8 THEN 'excess'
+            ELSE 'normal'
+        END
+    ) STORED,
     last_restock_date TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(sku_id, store_id)
@@ -87,9 +95,12 @@ CREATE TABLE pricing_history (
 -- ============================================================================
 
 -- Promotions
+CREATE SEQUENCE promotion_code_seq;
+
 CREATE TABLE promotions (
     id SERIAL PRIMARY KEY,
-    promotion_code VARCHAR(100) UNIQUE NOT NULL,
+    promotion_code VARCHAR(100) UNIQUE NOT NULL
+        DEFAULT 'PROMO-' || to_char(NOW(), 'YYYYMMDDHH24MISS') || '-' || nextval('promotion_code_seq'),
     sku_id INTEGER NOT NULL REFERENCES skus(id),
     store_id INTEGER NOT NULL REFERENCES stores(id),
     promotion_type VARCHAR(50) NOT NULL, -- 'flash_sale', 'coupon', 'discount'
@@ -190,6 +201,14 @@ CREATE TABLE token_usage (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Daily token usage totals, kept current by a trigger on token_usage (append-only)
+CREATE TABLE token_usage_daily (
+    usage_date DATE PRIMARY KEY,
+    estimated_cost DECIMAL(14, 6) NOT NULL DEFAULT 0,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    operations INTEGER NOT NULL DEFAULT 0
+);
+
 -- Agent Decision Log
 CREATE TABLE agent_decisions (
     id SERIAL PRIMARY KEY,
@@ -349,16 +368,24 @@ CREATE TABLE simulator_state (
 -- ============================================================================
 
 CREATE INDEX idx_inventory_sku_store ON inventory(sku_id, store_id);
+CREATE INDEX idx_inventory_stock_status ON inventory(stock_status) WHERE stock_status <> 'normal';
 CREATE INDEX idx_sales_sku_store_date ON sales_transactions(sku_id, store_id, transaction_date);
 CREATE INDEX idx_sales_transaction_date ON sales_transactions(transaction_date);
 CREATE INDEX idx_promotions_sku_store ON promotions(sku_id, store_id);
-CREATE INDEX idx_promotions_status ON promotions(status);
+CREATE INDEX idx_promotions_status_created ON promotions(status, created_at DESC);
+CREATE INDEX idx_promotions_sku_created ON promotions(sku_id, created_at DESC);
 CREATE INDEX idx_promotions_dates ON promotions(valid_from, valid_until);
+CREATE INDEX idx_promotions_finished ON promotions(status)
+    INCLUDE (margin_percent, actual_units_sold, expected_units_sold)
+    WHERE status IN ('completed', 'retracted');
 CREATE INDEX idx_competitor_prices_sku ON competitor_prices(sku_id, observed_date);
+CREATE INDEX idx_competitor_prices_latest ON competitor_prices(sku_id, competitor_name, observed_date DESC);
 CREATE INDEX idx_external_factors_type ON external_factors(factor_type, start_date);
 CREATE INDEX idx_token_usage_agent ON token_usage(agent_name, timestamp);
 CREATE INDEX idx_token_usage_sku ON token_usage(sku_id, timestamp);
+CREATE INDEX idx_token_usage_timestamp ON token_usage(timestamp) INCLUDE (agent_name, estimated_cost, total_tokens);
 CREATE INDEX idx_agent_decisions_sku ON agent_decisions(sku_id, created_at);
+CREATE INDEX idx_agent_decisions_created ON agent_decisions(created_at DESC);
 CREATE INDEX idx_pending_promotions_status ON pending_promotions(status, created_at);
 CREATE INDEX idx_pending_promotions_sku ON pending_promotions(sku_id, store_id);
 CREATE INDEX idx_decision_priors_scope ON decision_priors(sku_id, store_id, generated_at DESC);
@@ -385,11 +412,7 @@ SELECT
     st.name AS store_name,
     i.quantity,
     i.reorder_point,
-    CASE
-        WHEN i.quantity <= i.reorder_point THEN 'low'
-        WHEN i.quantity >= i.max_capacity * 0.8 THEN 'excess'
-        ELSE 'normal'
-    END AS stock_status
+    i.stock_status
 FROM inventory i
 JOIN skus s ON i.sku_id = s.id
 JOIN stores st ON i.store_id = st.id;
@@ -441,6 +464,38 @@ FROM token_usage
 GROUP BY agent_name
 ORDER BY total_cost DESC;
 
+-- Finished promotions bucketed by units sold vs. expected and by margin (Analytics page).
+-- Both histograms come from one scan via GROUPING SETS; dimension says which one a row is.
+CREATE VIEW v_promo_distributions AS
+WITH finished AS (
+    SELECT
+        CASE
+            WHEN expected_units_sold > 0 THEN
+                CASE
+                    WHEN (actual_units_sold::float / expected_units_sold) >= 1.5 THEN 'Excellent (150%+)'
+                    WHEN (actual_units_sold::float / expected_units_sold) >= 1.0 THEN 'Good (100-150%)'
+                    WHEN (actual_units_sold::float / expected_units_sold) >= 0.7 THEN 'Acceptable (70-100%)'
+                    ELSE 'Poor (<70%)'
+                END
+        END AS performance_category,
+        CASE
+            WHEN margin_percent >= 25 THEN '25%+'
+            WHEN margin_percent >= 20 THEN '20-25%'
+            WHEN margin_percent >= 15 THEN '15-20%'
+            WHEN margin_percent >= 10 THEN '10-15%'
+            ELSE '<10%'
+        END AS margin_range
+    FROM promotions
+    WHERE status IN ('completed', 'retracted')
+)
+SELECT
+    CASE WHEN GROUPING(performance_category) = 0 THEN 'performance' ELSE 'margin' END AS dimension,
+    COALESCE(performance_category, margin_range) AS bucket,
+    COUNT(*) AS count
+FROM finished
+GROUP BY GROUPING SETS ((performance_category), (margin_range))
+HAVING COALESCE(performance_category, margin_range) IS NOT NULL;
+
 -- Promotion ROI
 -- CREATE VIEW v_promotion_roi AS
 -- SELECT
@@ -532,6 +587,23 @@ CREATE TRIGGER update_approval_feedback_updated_at BEFORE UPDATE ON approval_fee
 CREATE TRIGGER update_embeddings_index_metadata_updated_at BEFORE UPDATE ON embeddings_index_metadata
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Fold each new token_usage row into its day's totals
+CREATE OR REPLACE FUNCTION rollup_token_usage_daily()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO token_usage_daily (usage_date, estimated_cost, total_tokens, operations)
+    VALUES (NEW.timestamp::date, NEW.estimated_cost, NEW.total_tokens, 1)
+    ON CONFLICT (usage_date) DO UPDATE SET
+        estimated_cost = token_usage_daily.estimated_cost + EXCLUDED.estimated_cost,
+        total_tokens = token_usage_daily.total_tokens + EXCLUDED.total_tokens,
+        operations = token_usage_daily.operations + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER rollup_token_usage_daily AFTER INSERT ON token_usage
+    FOR EACH ROW EXECUTE FUNCTION rollup_token_usage_daily();
+
 -- Function to calculate sell-through rate
 CREATE OR REPLACE FUNCTION calculate_sell_through_rate(
     p_sku_id INTEGER,
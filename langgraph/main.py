@@ -4,12 +4,15 @@ Autonomous pricing intelligence agent orchestration
 """
 
 import asyncio
+import json
 import os
 from contextlib import suppress
 from datetime import datetime
 from typing import Dict, List, Tuple
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import httpx
 import uvicorn
 
 # Set environment variables for LangSmith
@@ -26,6 +29,8 @@ from status_targets import compute_status_targets
 
 DEFAULT_SKUS = list(range(1, 21))
 DEFAULT_STORES = list(range(1, 6))
+STATUS_STREAM_INTERVAL_SECONDS = 0.5
+STATUS_STREAM_KEEPALIVE_SECONDS = 15.0
 
 # Initialize FastAPI for health checks and API
 app = FastAPI(title="LangGraph Pricing Agent", version="1.0.0")
@@ -149,6 +154,49 @@ def get_status():
     return get_status_payload()
 
 
+@app.get("/status/stream")
+async def stream_status(request: Request):
+    """
+    Server-sent events feed of the /status payload.
+    Emits only when the payload changes, with a keepalive comment while idle.
+    """
+
+    async def events():
+        last_payload = None
+        idle_seconds = 0.0
+        while not await request.is_disconnected():
+            payload = json.dumps(get_status_payload(), default=str)
+            if payload != last_payload:
+                last_payload = payload
+                idle_seconds = 0.0
+                yield f"data: {payload}\n\n"
+            elif idle_seconds >= STATUS_STREAM_KEEPALIVE_SECONDS:
+                idle_seconds = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(STATUS_STREAM_INTERVAL_SECONDS)
+            idle_seconds += STATUS_STREAM_INTERVAL_SECONDS
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/status/all")
+async def get_mcp_status():
+    """Probe every MCP server's /health concurrently and report which are up."""
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        responses = await asyncio.gather(
+            *(client.get(f"{url}/health") for url in config.MCP_SERVERS.values()),
+            return_exceptions=True,
+        )
+    return {
+        server: not isinstance(response, Exception) and response.status_code == 200
+        for server, response in zip(config.MCP_SERVERS, responses)
+    }
+
+
 @app.post("/agent/start")
 def start_agent():
     """Start/resume autonomous loop from current cursor."""
@@ -0,0 +1,107 @@
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+
+LANGGRAPH_DIR = Path(__file__).resolve().parents[1]
+if str(LANGGRAPH_DIR) not in sys.path:
+    sys.path.append(str(LANGGRAPH_DIR))
+
+# Lightweight graph stub for environments without the langgraph package installed.
+try:
+    import graph  # noqa: F401
+except ImportError:
+    graph_stub = types.ModuleType("graph")
+    graph_stub.create_pricing_graph = lambda: None
+    graph_stub.create_monitoring_graph = lambda: None
+    sys.modules["graph"] = graph_stub
+
+import main  # noqa: E402
+
+
+class FakeRequest:
+    """Reports a client disconnect after the given number of loop iterations."""
+
+    def __init__(self, iterations):
+        self.remaining = iterations
+
+    async def is_disconnected(self):
+        self.remaining -= 1
+        return self.remaining < 0
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeAsyncClient:
+    """Answers /health probes from a url -> status code (or exception) map."""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def get(self, url):
+        outcome = self.outcomes[url]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+class StatusStreamTests(unittest.IsolatedAsyncioTestCase):
+    async def collect_frames(self, payloads):
+        with patch.object(main, "get_status_payload", side_effect=payloads), \
+             patch.object(main.asyncio, "sleep", AsyncMock()):
+            response = await main.stream_status(FakeRequest(len(payloads)))
+            return [frame async for frame in response.body_iterator]
+
+    async def test_emits_one_data_frame_per_payload_change(self):
+        frames = await self.collect_frames([{"running": False}, {"running": False}, {"running": True}])
+
+        self.assertEqual(frames, [
+            'data: {"running": false}\n\n',
+            'data: {"running": true}\n\n',
+        ])
+
+    async def test_keepalive_only_after_idle_threshold(self):
+        with patch.object(main, "STATUS_STREAM_INTERVAL_SECONDS", 0.5), \
+             patch.object(main, "STATUS_STREAM_KEEPALIVE_SECONDS", 1.0):
+            # Idle for 0.5s after the first frame: below the threshold
+            short_idle = await self.collect_frames([{"running": False}] * 2)
+            # Idle for 1.0s on the third iteration: one keepalive, then the timer restarts
+            long_idle = await self.collect_frames([{"running": False}] * 4)
+
+        self.assertEqual(short_idle, ['data: {"running": false}\n\n'])
+        self.assertEqual(long_idle, ['data: {"running": false}\n\n', ": keepalive\n\n"])
+
+
+class McpStatusTests(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_or_non_200_probe_reports_down(self):
+        servers = {
+            "postgres": "http://postgres",
+            "weather": "http://weather",
+            "social": "http://social",
+        }
+        client = FakeAsyncClient({
+            "http://postgres/health": 200,
+            "http://weather/health": 500,
+            "http://social/health": OSError("connection refused"),
+        })
+
+        with patch.dict(main.config.MCP_SERVERS, servers, clear=True), \
+             patch.object(main.httpx, "AsyncClient", lambda **kwargs: client, create=True):
+            result = await main.get_mcp_status()
+
+        self.assertEqual(result, {"postgres": True, "weather": False, "social": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,7 @@ from typing import Dict, Any, List, Optional
 import config
 import os
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
 
 class CompetitorSimulator:
@@ -89,8 +89,8 @@ class CompetitorSimulator:
             "strategy": competitor_config["strategy"],
         }
 
-    def write_to_db(self, price_data: Dict[str, Any]) -> bool:
-        """Write competitor price data to competitor_prices table"""
+    def write_prices_to_db(self, prices: List[Dict[str, Any]]) -> bool:
+        """Write several competitor prices with one multi-row INSERT"""
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
@@ -98,17 +98,21 @@ class CompetitorSimulator:
             query = """
                 INSERT INTO competitor_prices
                 (competitor_name, sku_id, store_id, competitor_price, competitor_promotion, observed_date)
-                VALUES (%s, %s, %s, %s, %s, %s)
+                VALUES %s
             """
 
-            cursor.execute(query, (
-                price_data["competitor_name"],
-                price_data["sku_id"],
-                price_data["location_id"],
-                price_data["price"],
-                price_data["promotion"],
-                datetime.now()
-            ))
+            observed_date = datetime.now()
+            execute_values(cursor, query, [
+                (
+                    price_data["competitor_name"],
+                    price_data["sku_id"],
+                    price_data["location_id"],
+                    price_data["price"],
+                    price_data["promotion"],
+                    observed_date,
+                )
+                for price_data in prices
+            ], page_size=500)
 
             conn.commit()
             cursor.close()
@@ -116,7 +120,7 @@ class CompetitorSimulator:
             return True
 
         except Exception as e:
-            print(f"Error writing competitor price to DB: {e}")
+            print(f"Error writing competitor prices to DB: {e}")
             return False
 
     def get_competitor_prices(
@@ -133,12 +137,11 @@ class CompetitorSimulator:
             price_data["sku_id"] = sku_id
             price_data["location_id"] = location_id
             price_data["timestamp"] = datetime.now().isoformat()
-
-            # Write to database
-            self.write_to_db(price_data)
-
             prices.append(price_data)
 
+        # Write to database, all competitors in one round-trip
+        self.write_prices_to_db(prices)
+
         return prices
 
     def get_competitor_history(
@@ -5,10 +5,12 @@ Provides structured access to the pricing intelligence database
 
 import os
 import json
-from datetime import datetime, timedelta
+import threading
+from contextlib import contextmanager
 from typing import Dict, Any, List, Optional
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+from anyio import to_thread
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
@@ -24,11 +26,30 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD", os.getenv("POSTGRES_PASSWORD", "pricing_pass")),
     "database": os.getenv("DB_NAME", os.getenv("POSTGRES_DB", "pricing_intelligence")),
 }
+DB_SOCKET_DIR = os.getenv("DB_SOCKET_DIR", "/var/run/postgresql")
+LOCAL_DB_HOSTS = ("localhost", "127.0.0.1", "postgres")
+DB_POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN_CONN", 2))
+DB_POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX_CONN", 32))
 FEATURE_FLAGS = {
     "enable_approval_learning": os.getenv("ENABLE_APPROVAL_LEARNING", "false").lower() == "true",
 }
 
 
+def _resolve_db_host(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prefer the unix-domain socket when Postgres runs on the same host/pod.
+    libpq treats a directory path in `host` as a socket directory, which skips
+    the TCP loopback stack on every round-trip.
+    """
+    socket_file = os.path.join(DB_SOCKET_DIR, f".s.PGSQL.{config['port']}")
+    if config["host"] in LOCAL_DB_HOSTS and os.path.exists(socket_file):
+        return {**config, "host": DB_SOCKET_DIR}
+    return config
+
+
+DB_CONFIG = _resolve_db_host(DB_CONFIG)
+
+
 # Pydantic models
 class ToolRequest(BaseModel):
     tool_name: str
@@ -41,16 +62,54 @@ class ToolResponse(BaseModel):
     error: Optional[str] = None
 
 
-# Database connection helper
+# Database connection helpers
+_db_pool: Optional[ThreadedConnectionPool] = None
+_db_pool_lock = threading.Lock()
+
+
+def _get_db_pool() -> ThreadedConnectionPool:
+    """Create the shared connection pool on first use."""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ThreadedConnectionPool(DB_POOL_MIN_CONN, DB_POOL_MAX_CONN, **DB_CONFIG)
+    return _db_pool
+
+
 def get_db_connection():
-    """Create and return a database connection"""
+    """Check out a database connection from the pool"""
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
+        return _get_db_pool().getconn()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
 
+def release_db_connection(conn) -> None:
+    """Return a connection to the pool, discarding it if it is no longer usable."""
+    pool = _get_db_pool()
+    if conn.closed:
+        pool.putconn(conn, close=True)
+        return
+    try:
+        # Drop any uncommitted work (e.g. after an exception) before reuse.
+        conn.rollback()
+    except Exception:
+        pool.putconn(conn, close=True)
+        return
+    pool.putconn(conn)
+
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection for the duration of a `with` block."""
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        release_db_connection(conn)
+
+
 def _json_dumps_if_present(payload: Optional[Dict[str, Any]]) -> Optional[str]:
     """Serialize dict payloads for JSONB columns."""
     if payload is None:
@@ -58,6 +117,17 @@ def _json_dumps_if_present(payload: Optional[Dict[str, Any]]) -> Optional[str]:
     return json.dumps(payload)
 
 
+def _relax_commit_durability(cursor) -> None:
+    """
+    Skip the WAL fsync wait for the current transaction.
+    Only used for observability writes (token usage, performance checks,
+    evaluator scores, decision logs): a crash may lose the last few hundred
+    milliseconds of these rows, but the database stays consistent. Business
+    facts (promotion create/approve/retract) keep the default durable commit.
+    """
+    cursor.execute("SET LOCAL synchronous_commit = off")
+
+
 def _get_recent_decision_id_for_pending(cursor, pending_promotion_id: int) -> Optional[int]:
     """
     Best-effort link between pending promotion and decision log.
@@ -84,13 +154,29 @@ def _get_recent_decision_id_for_pending(cursor, pending_promotion_id: int) -> Op
 def health_check():
     """Health check endpoint"""
     try:
-        conn = get_db_connection()
-        conn.close()
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
         return {"status": "healthy", "service": "mcp-postgres"}
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
 
 
+@app.on_event("startup")
+async def size_worker_threads():
+    """
+    Sync routes run in anyio's worker threadpool. Cap it at the pool size so a
+    burst of requests waits for a thread instead of failing on an exhausted pool.
+    """
+    to_thread.current_default_thread_limiter().total_tokens = DB_POOL_MAX_CONN
+
+
+@app.on_event("shutdown")
+def close_db_pool():
+    """Close all pooled connections on shutdown."""
+    if _db_pool is not None:
+        _db_pool.closeall()
+
+
 # MCP Tool endpoint
 @app.post("/tool", response_model=ToolResponse)
 def execute_tool(request: ToolRequest):
@@ -99,64 +185,10 @@ def execute_tool(request: ToolRequest):
     parameters = request.parameters
 
     try:
-        if tool_name == "query_inventory_levels":
-            result = query_inventory_levels(**parameters)
-        elif tool_name == "calculate_sell_through_rate":
-            result = calculate_sell_through_rate(**parameters)
-        elif tool_name == "get_pricing_history":
-            result = get_pricing_history(**parameters)
-        elif tool_name == "create_promotion":
-            result = create_promotion(**parameters)
-        elif tool_name == "retract_promotion":
-            result = retract_promotion(**parameters)
-        elif tool_name == "log_performance_metric":
-            result = log_performance_metric(**parameters)
-        elif tool_name == "log_token_usage":
-            result = log_token_usage(**parameters)
-        elif tool_name == "get_cost_summary":
-            result = get_cost_summary(**parameters)
-        elif tool_name == "get_competitor_prices":
-            result = get_competitor_prices(**parameters)
-        elif tool_name == "log_agent_decision":
-            result = log_agent_decision(**parameters)
-        elif tool_name == "get_active_promotions":
-            result = get_active_promotions(**parameters)
-        elif tool_name == "update_promotion_performance":
-            result = update_promotion_performance(**parameters)
-        elif tool_name == "create_pending_promotion":
-            result = create_pending_promotion(**parameters)
-        elif tool_name == "get_pending_promotions":
-            result = get_pending_promotions(**parameters)
-        elif tool_name == "approve_promotion":
-            result = approve_promotion(**parameters)
-        elif tool_name == "reject_promotion":
-            result = reject_promotion(**parameters)
-        elif tool_name == "create_decision_prior":
-            result = create_decision_prior(**parameters)
-        elif tool_name == "get_latest_decision_prior":
-            result = get_latest_decision_prior(**parameters)
-        elif tool_name == "list_decision_priors":
-            result = list_decision_priors(**parameters)
-        elif tool_name == "create_approval_feedback":
-            result = create_approval_feedback(**parameters)
-        elif tool_name == "get_approval_feedback":
-            result = get_approval_feedback(**parameters)
-        elif tool_name == "log_optimization_iteration":
-            result = log_optimization_iteration(**parameters)
-        elif tool_name == "get_optimization_iterations":
-            result = get_optimization_iterations(**parameters)
-        elif tool_name == "log_evaluator_score":
-            result = log_evaluator_score(**parameters)
-        elif tool_name == "get_evaluator_scores":
-            result = get_evaluator_scores(**parameters)
-        elif tool_name == "upsert_embedding_metadata":
-            result = upsert_embedding_metadata(**parameters)
-        elif tool_name == "get_embedding_metadata":
-            result = get_embedding_metadata(**parameters)
-        elif tool_name == "get_historical_promotion_cases":
-            result = get_historical_promotion_cases(**parameters)
-        else:
+        handler = TOOL_HANDLERS.get(tool_name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {tool_name}")
+        result = handler(**parameters)
 
         return ToolResponse(success=True, data=result)
 
@@ -170,114 +202,95 @@ def execute_tool(request: ToolRequest):
 
 def query_inventory_levels(sku_id: int = None, store_id: int = None) -> List[Dict]:
     """Query current inventory levels"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT
-            i.id,
-            i.sku_id,
-            i.store_id,
-            s.sku_code,
-            s.name AS sku_name,
-            s.category,
-            st.store_code,
-            st.name AS store_name,
-            i.quantity,
-            i.reorder_point,
-            i.max_capacity,
-            CASE
-                WHEN i.quantity <= i.reorder_point THEN 'low'
-                WHEN i.quantity >= i.max_capacity * 0.8 THEN 'excess'
-                ELSE 'normal'
-            END AS stock_status
-        FROM inventory i
-        JOIN skus s ON i.sku_id = s.id
-        JOIN stores st ON i.store_id = st.id
-        WHERE s.is_active = true
-    """
-
-    params = []
-    if sku_id:
-        query += " AND i.sku_id = %s"
-        params.append(sku_id)
-    if store_id:
-        query += " AND i.store_id = %s"
-        params.append(store_id)
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT
+                i.id,
+                i.sku_id,
+                i.store_id,
+                s.sku_code,
+                s.name AS sku_name,
+                s.category,
+                st.store_code,
+                st.name AS store_name,
+                i.quantity,
+                i.reorder_point,
+                i.max_capacity,
+                i.stock_status
+            FROM inventory i
+            JOIN skus s ON i.sku_id = s.id
+            JOIN stores st ON i.store_id = st.id
+            WHERE s.is_active = true
+        """
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+        params = []
+        if sku_id:
+            query += " AND i.sku_id = %s"
+            params.append(sku_id)
+        if store_id:
+            query += " AND i.store_id = %s"
+            params.append(store_id)
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
 
-    return [dict(row) for row in results]
+        return [dict(row) for row in results]
 
 
 def calculate_sell_through_rate(sku_id: int, store_id: int, days: int = 7) -> Dict:
     """Calculate sell-through rate for a SKU at a store"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT
-            %s AS sku_id,
-            %s AS store_id,
-            COALESCE(SUM(quantity_sold), 0) AS total_sold,
-            COALESCE(ROUND(SUM(quantity_sold)::NUMERIC / %s, 2), 0) AS avg_daily_sales,
-            COUNT(DISTINCT DATE(transaction_date)) AS days_with_sales
-        FROM sales_transactions
-        WHERE sku_id = %s
-          AND store_id = %s
-          AND transaction_date >= NOW() - INTERVAL '%s days'
-    """
-
-    cursor.execute(query, (sku_id, store_id, days, sku_id, store_id, days))
-    result = cursor.fetchone()
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT
+                %(sku_id)s AS sku_id,
+                %(store_id)s AS store_id,
+                COALESCE(SUM(quantity_sold), 0) AS total_sold,
+                COALESCE(ROUND(SUM(quantity_sold)::NUMERIC / %(days)s, 2), 0) AS avg_daily_sales,
+                COUNT(DISTINCT DATE(transaction_date)) AS days_with_sales
+            FROM sales_transactions
+            WHERE sku_id = %(sku_id)s
+              AND store_id = %(store_id)s
+              AND transaction_date >= NOW() - make_interval(days => %(days)s)
+        """
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, {"sku_id": sku_id, "store_id": store_id, "days": days})
+        result = cursor.fetchone()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def get_pricing_history(sku_id: int, store_id: int = None, limit: int = 10) -> List[Dict]:
     """Get pricing history for a SKU"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT
-            ph.id,
-            ph.sku_id,
-            ph.store_id,
-            st.store_code,
-            ph.old_price,
-            ph.new_price,
-            ph.margin_percent,
-            ph.reason,
-            ph.changed_by,
-            ph.effective_date
-        FROM pricing_history ph
-        LEFT JOIN stores st ON ph.store_id = st.id
-        WHERE ph.sku_id = %s
-    """
-
-    params = [sku_id]
-    if store_id:
-        query += " AND ph.store_id = %s"
-        params.append(store_id)
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT
+                ph.id,
+                ph.sku_id,
+                ph.store_id,
+                st.store_code,
+                ph.old_price,
+                ph.new_price,
+                ph.margin_percent,
+                ph.reason,
+                ph.changed_by,
+                ph.effective_date
+            FROM pricing_history ph
+            LEFT JOIN stores st ON ph.store_id = st.id
+            WHERE ph.sku_id = %s
+        """
 
-    query += " ORDER BY ph.effective_date DESC LIMIT %s"
-    params.append(limit)
+        params = [sku_id]
+        if store_id:
+            query += " AND ph.store_id = %s"
+            params.append(store_id)
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+        query += " ORDER BY ph.effective_date DESC LIMIT %s"
+        params.append(limit)
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
 
-    return [dict(row) for row in results]
+        return [dict(row) for row in results]
 
 
 def create_promotion(
@@ -298,79 +311,65 @@ def create_promotion(
     reason: str = None,
 ) -> Dict:
     """Create a new promotion"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    # Generate promotion code
-    promotion_code = f"PROMO-{datetime.now().strftime('%Y%m%d%H%M%S')}-{sku_id}-{store_id}"
-
-    query = """
-        INSERT INTO promotions (
-            promotion_code, sku_id, store_id, promotion_type, discount_type, discount_value,
-            original_price, promotional_price, margin_percent, target_radius_km,
-            target_customer_segment, valid_from, valid_until, status,
-            expected_units_sold, expected_revenue, reason, created_by
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        RETURNING id, promotion_code, status
-    """
-
-    cursor.execute(
-        query,
-        (
-            promotion_code,
-            sku_id,
-            store_id,
-            promotion_type,
-            discount_type,
-            discount_value,
-            original_price,
-            promotional_price,
-            margin_percent,
-            target_radius_km,
-            target_customer_segment,
-            valid_from,
-            valid_until,
-            "active",
-            expected_units_sold,
-            expected_revenue,
-            reason,
-            "agent",
-        ),
-    )
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            INSERT INTO promotions (
+                sku_id, store_id, promotion_type, discount_type, discount_value,
+                original_price, promotional_price, margin_percent, target_radius_km,
+                target_customer_segment, valid_from, valid_until, status,
+                expected_units_sold, expected_revenue, reason, created_by
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, promotion_code, status
+        """
 
-    result = cursor.fetchone()
-    conn.commit()
+        cursor.execute(
+            query,
+            (
+                sku_id,
+                store_id,
+                promotion_type,
+                discount_type,
+                discount_value,
+                original_price,
+                promotional_price,
+                margin_percent,
+                target_radius_km,
+                target_customer_segment,
+                valid_from,
+                valid_until,
+                "active",
+                expected_units_sold,
+                expected_revenue,
+                reason,
+                "agent",
+            ),
+        )
 
-    cursor.close()
-    conn.close()
+        result = cursor.fetchone()
+        conn.commit()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def retract_promotion(promotion_id: int, reason: str) -> Dict:
     """Retract an active promotion"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        UPDATE promotions
-        SET status = 'retracted',
-            retraction_reason = %s,
-            retracted_at = NOW()
-        WHERE id = %s
-        RETURNING id, promotion_code, status, retracted_at
-    """
-
-    cursor.execute(query, (reason, promotion_id))
-    result = cursor.fetchone()
-    conn.commit()
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            UPDATE promotions
+            SET status = 'retracted',
+                retraction_reason = %s,
+                retracted_at = NOW()
+            WHERE id = %s
+            RETURNING id, promotion_code, status, retracted_at
+        """
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, (reason, promotion_id))
+        result = cursor.fetchone()
+        conn.commit()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def log_performance_metric(
@@ -383,37 +382,34 @@ def log_performance_metric(
     notes: str = None,
 ) -> Dict:
     """Log promotion performance metric"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        INSERT INTO promotion_performance (
-            promotion_id, units_sold_so_far, revenue_so_far,
-            performance_ratio, is_profitable, margin_maintained, notes
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, check_time
-    """
-
-    cursor.execute(
-        query,
-        (
-            promotion_id,
-            units_sold_so_far,
-            revenue_so_far,
-            performance_ratio,
-            is_profitable,
-            margin_maintained,
-            notes,
-        ),
-    )
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        _relax_commit_durability(cursor)
+
+        query = """
+            INSERT INTO promotion_performance (
+                promotion_id, units_sold_so_far, revenue_so_far,
+                performance_ratio, is_profitable, margin_maintained, notes
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id, check_time
+        """
 
-    result = cursor.fetchone()
-    conn.commit()
+        cursor.execute(
+            query,
+            (
+                promotion_id,
+                units_sold_so_far,
+                revenue_so_far,
+                performance_ratio,
+                is_profitable,
+                margin_maintained,
+                notes,
+            ),
+        )
 
-    cursor.close()
-    conn.close()
+        result = cursor.fetchone()
+        conn.commit()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def log_token_usage(
@@ -427,106 +423,101 @@ def log_token_usage(
     context: Dict = None,
 ) -> Dict:
     """Log token usage and cost"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        INSERT INTO token_usage (
-            agent_name, operation, prompt_tokens, completion_tokens,
-            total_tokens, estimated_cost, sku_id, context
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, timestamp
-    """
-
-    cursor.execute(
-        query,
-        (
-            agent_name,
-            operation,
-            prompt_tokens,
-            completion_tokens,
-            total_tokens,
-            estimated_cost,
-            sku_id,
-            json.dumps(context) if context else None,
-        ),
-    )
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        _relax_commit_durability(cursor)
+
+        query = """
+            INSERT INTO token_usage (
+                agent_name, operation, prompt_tokens, completion_tokens,
+                total_tokens, estimated_cost, sku_id, context
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id, timestamp
+        """
 
-    result = cursor.fetchone()
-    conn.commit()
+        cursor.execute(
+            query,
+            (
+                agent_name,
+                operation,
+                prompt_tokens,
+                completion_tokens,
+                total_tokens,
+                estimated_cost,
+                sku_id,
+                json.dumps(context) if context else None,
+            ),
+        )
 
-    cursor.close()
-    conn.close()
+        result = cursor.fetchone()
+        conn.commit()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def get_cost_summary(
     agent_name: str = None, sku_id: int = None, days: int = 7
 ) -> Dict:
     """Get cost summary"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT
-            COUNT(*) AS operation_count,
-            SUM(total_tokens) AS total_tokens,
-            SUM(estimated_cost) AS total_cost,
-            AVG(estimated_cost) AS avg_cost_per_operation,
-            MAX(timestamp) AS last_operation
-        FROM token_usage
-        WHERE timestamp >= NOW() - INTERVAL '%s days'
-    """
-
-    params = [days]
-    if agent_name:
-        query += " AND agent_name = %s"
-        params.append(agent_name)
-    if sku_id:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT
+                COUNT(*) AS operation_count,
+                SUM(total_tokens) AS total_tokens,
+                SUM(estimated_cost) AS total_cost,
+                AVG(estimated_cost) AS avg_cost_per_operation,
+                MAX(timestamp) AS last_operation
+            FROM token_usage
+            WHERE timestamp >= NOW() - make_interval(days => %s)
+        """
 
-    cursor.execute(query, params)
-    result = cursor.fetchone()
+        params = [days]
+        if agent_name:
+            query += " AND agent_name = %s"
+            params.append(agent_name)
+        if sku_id:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, params)
+        result = cursor.fetchone()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def get_competitor_prices(sku_id: int, store_id: int = None) -> List[Dict]:
     """Get latest competitor prices for a SKU"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT DISTINCT ON (competitor_name)
-            competitor_name,
-            sku_id,
-            store_id,
-            competitor_price,
-            competitor_promotion,
-            observed_date
-        FROM competitor_prices
-        WHERE sku_id = %s
-    """
-
-    params = [sku_id]
-    if store_id:
-        query += " AND store_id = %s"
-        params.append(store_id)
-
-    query += " ORDER BY competitor_name, observed_date DESC"
-
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        # One index seek per competitor (idx_competitor_prices_latest) instead of
+        # sorting the SKU's whole observation history for DISTINCT ON.
+        store_filter = " AND store_id = %(store_id)s" if store_id else ""
+        query = f"""
+            SELECT c.*
+            FROM (
+                SELECT DISTINCT competitor_name
+                FROM competitor_prices
+                WHERE sku_id = %(sku_id)s{store_filter}
+            ) names
+            JOIN LATERAL (
+                SELECT
+                    competitor_name,
+                    sku_id,
+                    store_id,
+                    competitor_price,
+                    competitor_promotion,
+                    observed_date
+                FROM competitor_prices
+                WHERE sku_id = %(sku_id)s
+                  AND competitor_name = names.competitor_name{store_filter}
+                ORDER BY observed_date DESC
+                LIMIT 1
+            ) c ON true
+            ORDER BY c.competitor_name
+        """
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, {"sku_id": sku_id, "store_id": store_id})
+        results = cursor.fetchall()
 
-    return [dict(row) for row in results]
+        return [dict(row) for row in results]
 
 
 def log_agent_decision(
@@ -541,89 +532,87 @@ def log_agent_decision(
     promotion_id: int = None,
 ) -> Dict:
     """Log agent decision"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        INSERT INTO agent_decisions (
-            agent_name, sku_id, store_id, decision_type, prompt_fed, reasoning,
-            data_used, decision_outcome, promotion_id
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, decision_id, created_at
-    """
-
-    cursor.execute(
-        query,
-        (
-            agent_name,
-            sku_id,
-            store_id,
-            decision_type,
-            prompt_fed,
-            reasoning,
-            json.dumps(data_used),
-            decision_outcome,
-            promotion_id,
-        ),
-    )
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        _relax_commit_durability(cursor)
+
+        query = """
+            INSERT INTO agent_decisions (
+                agent_name, sku_id, store_id, decision_type, prompt_fed, reasoning,
+                data_used, decision_outcome, promotion_id
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id, decision_id, created_at
+        """
 
-    result = cursor.fetchone()
-    conn.commit()
+        cursor.execute(
+            query,
+            (
+                agent_name,
+                sku_id,
+                store_id,
+                decision_type,
+                prompt_fed,
+                reasoning,
+                json.dumps(data_used),
+                decision_outcome,
+                promotion_id,
+            ),
+        )
 
-    cursor.close()
-    conn.close()
+        result = cursor.fetchone()
+        conn.commit()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def get_active_promotions(store_id: int = None) -> List[Dict]:
     """Get all active promotions"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT * FROM v_active_promotions
-        WHERE 1=1
-    """
-
-    params = []
-    if store_id:
-        query += " AND store_id = %s"
-        params.append(store_id)
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT * FROM v_active_promotions
+            WHERE 1=1
+        """
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+        params = []
+        if store_id:
+            query += " AND store_id = %s"
+            params.append(store_id)
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
 
-    return [dict(row) for row in results]
+        return [dict(row) for row in results]
 
 
 def update_promotion_performance(
     promotion_id: int, units_sold: int, revenue: float
 ) -> Dict:
     """Update promotion actual performance"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        UPDATE promotions
-        SET actual_units_sold = actual_units_sold + %s,
-            actual_revenue = actual_revenue + %s,
-            updated_at = NOW()
-        WHERE id = %s
-        RETURNING id, actual_units_sold, actual_revenue
-    """
-
-    cursor.execute(query, (units_sold, revenue, promotion_id))
-    result = cursor.fetchone()
-    conn.commit()
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        # COALESCE guards the increment against NULL counters; the performance
+        # ratio is derived in the same round-trip so callers need no follow-up read.
+        query = """
+            WITH upd AS (
+                UPDATE promotions
+                SET actual_units_sold = COALESCE(actual_units_sold, 0) + %s,
+                    actual_revenue = COALESCE(actual_revenue, 0) + %s,
+                    updated_at = NOW()
+                WHERE id = %s
+                RETURNING id, sku_id, store_id, expected_units_sold, actual_units_sold, actual_revenue
+            )
+            SELECT
+                upd.*,
+                CASE
+                    WHEN upd.expected_units_sold > 0
+                    THEN ROUND(upd.actual_units_sold::NUMERIC / upd.expected_units_sold, 4)
+                END AS performance_ratio
+            FROM upd
+        """
 
-    cursor.close()
-    conn.close()
+        cursor.execute(query, (units_sold, revenue, promotion_id))
+        result = cursor.fetchone()
+        conn.commit()
 
-    return dict(result) if result else {}
+        return dict(result) if result else {}
 
 
 def create_pending_promotion(
@@ -645,225 +634,248 @@ def create_pending_promotion(
     market_data: Dict = None,
 ) -> Dict:
     """Create a pending promotion awaiting manual approval"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        INSERT INTO pending_promotions (
-            sku_id, store_id, promotion_type, discount_type, discount_value,
-            original_price, promotional_price, margin_percent,
-            target_radius_km, target_customer_segment,
-            proposed_valid_from, proposed_valid_until,
-            expected_units_sold, expected_revenue,
-            agent_reasoning, market_data, status
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            INSERT INTO pending_promotions (
+                sku_id, store_id, promotion_type, discount_type, discount_value,
+                original_price, promotional_price, margin_percent,
+                target_radius_km, target_customer_segment,
+                proposed_valid_from, proposed_valid_until,
+                expected_units_sold, expected_revenue,
+                agent_reasoning, market_data, status
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, status, created_at
+        """
+
+        cursor.execute(
+            query,
+            (
+                sku_id,
+                store_id,
+                promotion_type,
+                discount_type,
+                discount_value,
+                original_price,
+                promotional_price,
+                margin_percent,
+                target_radius_km,
+                target_customer_segment,
+                proposed_valid_from,
+                proposed_valid_until,
+                expected_units_sold,
+                expected_revenue,
+                agent_reasoning,
+                json.dumps(market_data) if market_data else None,
+                "pending",
+            ),
         )
-        RETURNING id, status, created_at
-    """
 
-    cursor.execute(
-        query,
-        (
-            sku_id,
-            store_id,
-            promotion_type,
-            discount_type,
-            discount_value,
-            original_price,
-            promotional_price,
-            margin_percent,
-            target_radius_km,
-            target_customer_segment,
-            proposed_valid_from,
-            proposed_valid_until,
-            expected_units_sold,
-            expected_revenue,
-            agent_reasoning,
-            json.dumps(market_data) if market_data else None,
-            "pending",
-        ),
-    )
+        result = cursor.fetchone()
+        conn.commit()
 
-    result = cursor.fetchone()
-    conn.commit()
+        return dict(result) if result else {}
 
-    cursor.close()
-    conn.close()
 
-    return dict(result) if result else {}
+def _fetch_pending_promotions(conn, status: str, store_id: int = None) -> List[Dict]:
+    """Pending promotion rows for one review status, newest first"""
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT * FROM v_pending_promotions
+            WHERE status = %s
+        """
 
+        params = [status]
+        if store_id:
+            query += " AND store_id = %s"
+            params.append(store_id)
 
-def get_pending_promotions(status: str = "pending", store_id: int = None) -> List[Dict]:
-    """Get pending promotions awaiting approval"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+        query += " ORDER BY created_at DESC"
 
-    query = """
-        SELECT * FROM v_pending_promotions
-        WHERE status = %s
-    """
+        cursor.execute(query, params)
+        results = cursor.fetchall()
 
-    params = [status]
-    if store_id:
-        query += " AND store_id = %s"
-        params.append(store_id)
+        return [dict(row) for row in results]
 
-    query += " ORDER BY created_at DESC"
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+def _fetch_promotion_status_counts(conn, store_id: int = None) -> Dict[str, int]:
+    """Pending promotion count per review status"""
+    with conn.cursor() as cursor:
+        query = "SELECT status, COUNT(*) FROM pending_promotions"
 
-    cursor.close()
-    conn.close()
+        params = []
+        if store_id:
+            query += " WHERE store_id = %s"
+            params.append(store_id)
 
-    return [dict(row) for row in results]
+        query += " GROUP BY status"
 
+        cursor.execute(query, params)
 
-def approve_promotion(
-    pending_promotion_id: int,
-    reviewed_by: str,
-    reviewer_notes: str = None,
-) -> Dict:
-    """Approve a pending promotion and create an active promotion"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+        return {status: count for status, count in cursor.fetchall()}
 
-    # Get pending promotion details
-    cursor.execute(
-        "SELECT * FROM pending_promotions WHERE id = %s AND status = 'pending'",
-        (pending_promotion_id,),
-    )
-    pending = cursor.fetchone()
-
-    if not pending:
-        cursor.close()
-        conn.close()
-        raise ValueError(f"Pending promotion {pending_promotion_id} not found or already processed")
-
-    # Generate promotion code
-    promotion_code = f"PROMO-{datetime.now().strftime('%Y%m%d%H%M%S')}-{pending['sku_id']}-{pending['store_id']}"
-
-    # Create active promotion
-    create_query = """
-        INSERT INTO promotions (
-            promotion_code, sku_id, store_id, promotion_type, discount_type, discount_value,
-            original_price, promotional_price, margin_percent, target_radius_km,
-            target_customer_segment, valid_from, valid_until, status,
-            expected_units_sold, expected_revenue, reason, created_by
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        RETURNING id, promotion_code, status
-    """
 
-    cursor.execute(
-        create_query,
-        (
-            promotion_code,
-            pending["sku_id"],
-            pending["store_id"],
-            pending["promotion_type"],
-            pending["discount_type"],
-            pending["discount_value"],
-            pending["original_price"],
-            pending["promotional_price"],
-            pending["margin_percent"],
-            pending["target_radius_km"],
-            pending["target_customer_segment"],
-            pending["proposed_valid_from"],
-            pending["proposed_valid_until"],
-            "active",
-            pending["expected_units_sold"],
-            pending["expected_revenue"],
-            pending["agent_reasoning"],
-            reviewed_by,
-        ),
-    )
+def get_pending_promotions(status: str = "pending", store_id: int = None) -> List[Dict]:
+    """Get pending promotions awaiting approval"""
+    with db_connection() as conn:
+        return _fetch_pending_promotions(conn, status, store_id)
 
-    promotion_result = cursor.fetchone()
-
-    # Update pending promotion status
-    update_query = """
-        UPDATE pending_promotions
-        SET status = 'approved',
-            reviewed_by = %s,
-            reviewed_at = NOW(),
-            reviewer_notes = %s,
-            approved_promotion_id = %s,
-            updated_at = NOW()
-        WHERE id = %s
-        RETURNING id, status, reviewed_at
-    """
 
-    cursor.execute(
-        update_query,
-        (reviewed_by, reviewer_notes, promotion_result["id"], pending_promotion_id),
-    )
+def get_promotion_status_counts(store_id: int = None) -> Dict[str, int]:
+    """Count pending promotions per review status in one query"""
+    with db_connection() as conn:
+        return _fetch_promotion_status_counts(conn, store_id)
+
+
+def get_queue_snapshot(status: str = "pending", store_id: int = None) -> Dict:
+    """
+    Approval queue in one call: the promotions in `status` plus the per-status
+    counts, read in a single read-only transaction so the two always agree.
+    """
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
 
-    pending_result = cursor.fetchone()
-    feedback_id = None
-    if FEATURE_FLAGS["enable_approval_learning"]:
-        decision_id = _get_recent_decision_id_for_pending(cursor, pending_promotion_id)
-        context_payload = {
-            "promotion_type": pending["promotion_type"],
-            "discount_type": pending["discount_type"],
-            "discount_value": float(pending["discount_value"]),
-            "original_price": float(pending["original_price"]),
-            "promotional_price": float(pending["promotional_price"]),
-            "margin_percent": float(pending["margin_percent"]),
-            "expected_units_sold": pending.get("expected_units_sold"),
-            "expected_revenue": float(pending["expected_revenue"]) if pending.get("expected_revenue") is not None else None,
-            "agent_reasoning": pending.get("agent_reasoning"),
-            "market_data": pending.get("market_data"),
+        return {
+            "rows": _fetch_pending_promotions(conn, status, store_id),
+            "counts": _fetch_promotion_status_counts(conn, store_id),
         }
 
+
+def approve_promotion(
+    pending_promotion_id: int,
+    reviewed_by: str,
+    reviewer_notes: str = None,
+) -> Dict:
+    """Approve a pending promotion and create an active promotion"""
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        # Get pending promotion details
         cursor.execute(
-            """
-            INSERT INTO approval_feedback (
-                pending_promotion_id, promotion_id, decision_id,
-                sku_id, store_id, reviewer_outcome, reviewed_by,
-                reviewer_notes, decision_context, feedback_payload
+            "SELECT * FROM pending_promotions WHERE id = %s AND status = 'pending'",
+            (pending_promotion_id,),
+        )
+        pending = cursor.fetchone()
+
+        if not pending:
+            raise ValueError(f"Pending promotion {pending_promotion_id} not found or already processed")
+
+        # Create active promotion
+        create_query = """
+            INSERT INTO promotions (
+                sku_id, store_id, promotion_type, discount_type, discount_value,
+                original_price, promotional_price, margin_percent, target_radius_km,
+                target_customer_segment, valid_from, valid_until, status,
+                expected_units_sold, expected_revenue, reason, created_by
             ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
             )
-            RETURNING id
-            """,
+            RETURNING id, promotion_code, status
+        """
+
+        cursor.execute(
+            create_query,
             (
-                pending_promotion_id,
-                promotion_result["id"],
-                decision_id,
                 pending["sku_id"],
                 pending["store_id"],
-                "approved",
+                pending["promotion_type"],
+                pending["discount_type"],
+                pending["discount_value"],
+                pending["original_price"],
+                pending["promotional_price"],
+                pending["margin_percent"],
+                pending["target_radius_km"],
+                pending["target_customer_segment"],
+                pending["proposed_valid_from"],
+                pending["proposed_valid_until"],
+                "active",
+                pending["expected_units_sold"],
+                pending["expected_revenue"],
+                pending["agent_reasoning"],
                 reviewed_by,
-                reviewer_notes,
-                _json_dumps_if_present(context_payload),
-                _json_dumps_if_present(
-                    {
-                        "outcome": "approved",
-                        "approved_promotion_id": promotion_result["id"],
-                        "approved_promotion_code": promotion_result["promotion_code"],
-                    }
-                ),
             ),
         )
-        feedback_row = cursor.fetchone()
-        feedback_id = feedback_row["id"] if feedback_row else None
 
-    conn.commit()
+        promotion_result = cursor.fetchone()
+
+        # Update pending promotion status
+        update_query = """
+            UPDATE pending_promotions
+            SET status = 'approved',
+                reviewed_by = %s,
+                reviewed_at = NOW(),
+                reviewer_notes = %s,
+                approved_promotion_id = %s,
+                updated_at = NOW()
+            WHERE id = %s
+            RETURNING id, status, reviewed_at
+        """
 
-    cursor.close()
-    conn.close()
+        cursor.execute(
+            update_query,
+            (reviewed_by, reviewer_notes, promotion_result["id"], pending_promotion_id),
+        )
 
-    return {
-        "pending_promotion_id": pending_result["id"],
-        "pending_status": pending_result["status"],
-        "promotion_id": promotion_result["id"],
-        "promotion_code": promotion_result["promotion_code"],
-        "promotion_status": promotion_result["status"],
-        "approval_feedback_id": feedback_id,
-    }
+        pending_result = cursor.fetchone()
+        feedback_id = None
+        if FEATURE_FLAGS["enable_approval_learning"]:
+            decision_id = _get_recent_decision_id_for_pending(cursor, pending_promotion_id)
+            context_payload = {
+                "promotion_type": pending["promotion_type"],
+                "discount_type": pending["discount_type"],
+                "discount_value": float(pending["discount_value"]),
+                "original_price": float(pending["original_price"]),
+                "promotional_price": float(pending["promotional_price"]),
+                "margin_percent": float(pending["margin_percent"]),
+                "expected_units_sold": pending.get("expected_units_sold"),
+                "expected_revenue": float(pending["expected_revenue"]) if pending.get("expected_revenue") is not None else None,
+                "agent_reasoning": pending.get("agent_reasoning"),
+                "market_data": pending.get("market_data"),
+            }
+
+            cursor.execute(
+                """
+                INSERT INTO approval_feedback (
+                    pending_promotion_id, promotion_id, decision_id,
+                    sku_id, store_id, reviewer_outcome, reviewed_by,
+                    reviewer_notes, decision_context, feedback_payload
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                )
+                RETURNING id
+                """,
+                (
+                    pending_promotion_id,
+                    promotion_result["id"],
+                    decision_id,
+                    pending["sku_id"],
+                    pending["store_id"],
+                    "approved",
+                    reviewed_by,
+                    reviewer_notes,
+                    _json_dumps_if_present(context_payload),
+                    _json_dumps_if_present(
+                        {
+                            "outcome": "approved",
+                            "approved_promotion_id": promotion_result["id"],
+                            "approved_promotion_code": promotion_result["promotion_code"],
+                        }
+                    ),
+                ),
+            )
+            feedback_row = cursor.fetchone()
+            feedback_id = feedback_row["id"] if feedback_row else None
+
+        conn.commit()
+
+        return {
+            "pending_promotion_id": pending_result["id"],
+            "pending_status": pending_result["status"],
+            "promotion_id": promotion_result["id"],
+            "promotion_code": promotion_result["promotion_code"],
+            "promotion_status": promotion_result["status"],
+            "approval_feedback_id": feedback_id,
+        }
 
 
 def reject_promotion(
@@ -872,95 +884,86 @@ def reject_promotion(
     reviewer_notes: str,
 ) -> Dict:
     """Reject a pending promotion"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute(
-        "SELECT * FROM pending_promotions WHERE id = %s AND status = 'pending'",
-        (pending_promotion_id,),
-    )
-    pending = cursor.fetchone()
-    if not pending:
-        cursor.close()
-        conn.close()
-        raise ValueError(f"Pending promotion {pending_promotion_id} not found or already processed")
-
-    query = """
-        UPDATE pending_promotions
-        SET status = 'rejected',
-            reviewed_by = %s,
-            reviewed_at = NOW(),
-            reviewer_notes = %s,
-            updated_at = NOW()
-        WHERE id = %s AND status = 'pending'
-        RETURNING id, status, reviewed_by, reviewed_at
-    """
-
-    cursor.execute(query, (reviewed_by, reviewer_notes, pending_promotion_id))
-    result = cursor.fetchone()
-
-    if not result:
-        cursor.close()
-        conn.close()
-        raise ValueError(f"Pending promotion {pending_promotion_id} not found or already processed")
-
-    feedback_id = None
-    if FEATURE_FLAGS["enable_approval_learning"]:
-        decision_id = _get_recent_decision_id_for_pending(cursor, pending_promotion_id)
-        context_payload = {
-            "promotion_type": pending["promotion_type"],
-            "discount_type": pending["discount_type"],
-            "discount_value": float(pending["discount_value"]),
-            "original_price": float(pending["original_price"]),
-            "promotional_price": float(pending["promotional_price"]),
-            "margin_percent": float(pending["margin_percent"]),
-            "expected_units_sold": pending.get("expected_units_sold"),
-            "expected_revenue": float(pending["expected_revenue"]) if pending.get("expected_revenue") is not None else None,
-            "agent_reasoning": pending.get("agent_reasoning"),
-            "market_data": pending.get("market_data"),
-        }
-
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
         cursor.execute(
-            """
-            INSERT INTO approval_feedback (
-                pending_promotion_id, promotion_id, decision_id,
-                sku_id, store_id, reviewer_outcome, reviewed_by,
-                reviewer_notes, decision_context, feedback_payload
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            RETURNING id
-            """,
-            (
-                pending_promotion_id,
-                None,
-                decision_id,
-                pending["sku_id"],
-                pending["store_id"],
-                "rejected",
-                reviewed_by,
-                reviewer_notes,
-                _json_dumps_if_present(context_payload),
-                _json_dumps_if_present(
-                    {
-                        "outcome": "rejected",
-                        "rejection_reason": reviewer_notes,
-                    }
-                ),
-            ),
+            "SELECT * FROM pending_promotions WHERE id = %s AND status = 'pending'",
+            (pending_promotion_id,),
         )
-        feedback_row = cursor.fetchone()
-        feedback_id = feedback_row["id"] if feedback_row else None
+        pending = cursor.fetchone()
+        if not pending:
+            raise ValueError(f"Pending promotion {pending_promotion_id} not found or already processed")
+
+        query = """
+            UPDATE pending_promotions
+            SET status = 'rejected',
+                reviewed_by = %s,
+                reviewed_at = NOW(),
+                reviewer_notes = %s,
+                updated_at = NOW()
+            WHERE id = %s AND status = 'pending'
+            RETURNING id, status, reviewed_by, reviewed_at
+        """
 
-    conn.commit()
+        cursor.execute(query, (reviewed_by, reviewer_notes, pending_promotion_id))
+        result = cursor.fetchone()
+
+        if not result:
+            raise ValueError(f"Pending promotion {pending_promotion_id} not found or already processed")
+
+        feedback_id = None
+        if FEATURE_FLAGS["enable_approval_learning"]:
+            decision_id = _get_recent_decision_id_for_pending(cursor, pending_promotion_id)
+            context_payload = {
+                "promotion_type": pending["promotion_type"],
+                "discount_type": pending["discount_type"],
+                "discount_value": float(pending["discount_value"]),
+                "original_price": float(pending["original_price"]),
+                "promotional_price": float(pending["promotional_price"]),
+                "margin_percent": float(pending["margin_percent"]),
+                "expected_units_sold": pending.get("expected_units_sold"),
+                "expected_revenue": float(pending["expected_revenue"]) if pending.get("expected_revenue") is not None else None,
+                "agent_reasoning": pending.get("agent_reasoning"),
+                "market_data": pending.get("market_data"),
+            }
+
+            cursor.execute(
+                """
+                INSERT INTO approval_feedback (
+                    pending_promotion_id, promotion_id, decision_id,
+                    sku_id, store_id, reviewer_outcome, reviewed_by,
+                    reviewer_notes, decision_context, feedback_payload
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                )
+                RETURNING id
+                """,
+                (
+                    pending_promotion_id,
+                    None,
+                    decision_id,
+                    pending["sku_id"],
+                    pending["store_id"],
+                    "rejected",
+                    reviewed_by,
+                    reviewer_notes,
+                    _json_dumps_if_present(context_payload),
+                    _json_dumps_if_present(
+                        {
+                            "outcome": "rejected",
+                            "rejection_reason": reviewer_notes,
+                        }
+                    ),
+                ),
+            )
+            feedback_row = cursor.fetchone()
+            feedback_id = feedback_row["id"] if feedback_row else None
 
-    cursor.close()
-    conn.close()
+        conn.commit()
 
-    result_payload = dict(result) if result else {}
-    if feedback_id is not None:
-        result_payload["approval_feedback_id"] = feedback_id
-    return result_payload
+        result_payload = dict(result) if result else {}
+        if feedback_id is not None:
+            result_payload["approval_feedback_id"] = feedback_id
+        return result_payload
 
 
 def create_decision_prior(
@@ -977,40 +980,36 @@ def create_decision_prior(
     generated_by: str = "decision_learning_service",
 ) -> Dict:
     """Persist a learned decision prior."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute(
-        """
-        INSERT INTO decision_priors (
-            sku_id, store_id, source_decision_id, source_promotion_id,
-            prior_version, success_probability, confidence_score,
-            expected_roi_band, risk_flags, prior_payload, generated_by
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(
+            """
+            INSERT INTO decision_priors (
+                sku_id, store_id, source_decision_id, source_promotion_id,
+                prior_version, success_probability, confidence_score,
+                expected_roi_band, risk_flags, prior_payload, generated_by
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, generated_at
+            """,
+            (
+                sku_id,
+                store_id,
+                source_decision_id,
+                source_promotion_id,
+                prior_version,
+                success_probability,
+                confidence_score,
+                expected_roi_band,
+                _json_dumps_if_present(risk_flags),
+                json.dumps(prior_payload),
+                generated_by,
+            ),
         )
-        RETURNING id, generated_at
-        """,
-        (
-            sku_id,
-            store_id,
-            source_decision_id,
-            source_promotion_id,
-            prior_version,
-            success_probability,
-            confidence_score,
-            expected_roi_band,
-            _json_dumps_if_present(risk_flags),
-            json.dumps(prior_payload),
-            generated_by,
-        ),
-    )
-    row = cursor.fetchone()
-    conn.commit()
+        row = cursor.fetchone()
+        conn.commit()
 
-    cursor.close()
-    conn.close()
-    return dict(row) if row else {}
+        return dict(row) if row else {}
 
 
 def get_latest_decision_prior(
@@ -1019,30 +1018,26 @@ def get_latest_decision_prior(
     max_age_hours: int = 720,
 ) -> Dict:
     """Get the most recent decision prior for a given scope."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT *
-        FROM decision_priors
-        WHERE generated_at >= NOW() - (%s * INTERVAL '1 hour')
-    """
-    params: List[Any] = [max_age_hours]
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT *
+            FROM decision_priors
+            WHERE generated_at >= NOW() - (%s * INTERVAL '1 hour')
+        """
+        params: List[Any] = [max_age_hours]
 
-    if sku_id is not None:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
-    if store_id is not None:
-        query += " AND store_id = %s"
-        params.append(store_id)
+        if sku_id is not None:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
+        if store_id is not None:
+            query += " AND store_id = %s"
+            params.append(store_id)
 
-    query += " ORDER BY generated_at DESC, id DESC LIMIT 1"
-    cursor.execute(query, params)
-    row = cursor.fetchone()
+        query += " ORDER BY generated_at DESC, id DESC LIMIT 1"
+        cursor.execute(query, params)
+        row = cursor.fetchone()
 
-    cursor.close()
-    conn.close()
-    return dict(row) if row else {}
+        return dict(row) if row else {}
 
 
 def list_decision_priors(
@@ -1051,31 +1046,27 @@ def list_decision_priors(
     limit: int = 25,
 ) -> List[Dict]:
     """List decision priors for diagnostics and analysis."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT *
-        FROM decision_priors
-        WHERE 1=1
-    """
-    params: List[Any] = []
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT *
+            FROM decision_priors
+            WHERE 1=1
+        """
+        params: List[Any] = []
 
-    if sku_id is not None:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
-    if store_id is not None:
-        query += " AND store_id = %s"
-        params.append(store_id)
+        if sku_id is not None:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
+        if store_id is not None:
+            query += " AND store_id = %s"
+            params.append(store_id)
 
-    query += " ORDER BY generated_at DESC, id DESC LIMIT %s"
-    params.append(limit)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+        query += " ORDER BY generated_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
 
-    cursor.close()
-    conn.close()
-    return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
 
 def create_approval_feedback(
@@ -1091,38 +1082,34 @@ def create_approval_feedback(
     feedback_payload: Dict = None,
 ) -> Dict:
     """Insert an approval feedback signal."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute(
-        """
-        INSERT INTO approval_feedback (
-            pending_promotion_id, promotion_id, decision_id, sku_id, store_id,
-            reviewer_outcome, reviewed_by, reviewer_notes, decision_context, feedback_payload
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(
+            """
+            INSERT INTO approval_feedback (
+                pending_promotion_id, promotion_id, decision_id, sku_id, store_id,
+                reviewer_outcome, reviewed_by, reviewer_notes, decision_context, feedback_payload
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, created_at
+            """,
+            (
+                pending_promotion_id,
+                promotion_id,
+                decision_id,
+                sku_id,
+                store_id,
+                reviewer_outcome,
+                reviewed_by,
+                reviewer_notes,
+                _json_dumps_if_present(decision_context),
+                _json_dumps_if_present(feedback_payload),
+            ),
         )
-        RETURNING id, created_at
-        """,
-        (
-            pending_promotion_id,
-            promotion_id,
-            decision_id,
-            sku_id,
-            store_id,
-            reviewer_outcome,
-            reviewed_by,
-            reviewer_notes,
-            _json_dumps_if_present(decision_context),
-            _json_dumps_if_present(feedback_payload),
-        ),
-    )
 
-    row = cursor.fetchone()
-    conn.commit()
-    cursor.close()
-    conn.close()
-    return dict(row) if row else {}
+        row = cursor.fetchone()
+        conn.commit()
+        return dict(row) if row else {}
 
 
 def get_approval_feedback(
@@ -1133,34 +1120,30 @@ def get_approval_feedback(
     limit: int = 100,
 ) -> List[Dict]:
     """Retrieve approval feedback signals."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT *
-        FROM approval_feedback
-        WHERE created_at >= NOW() - (%s * INTERVAL '1 day')
-    """
-    params: List[Any] = [days]
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT *
+            FROM approval_feedback
+            WHERE created_at >= NOW() - (%s * INTERVAL '1 day')
+        """
+        params: List[Any] = [days]
 
-    if reviewer_outcome:
-        query += " AND reviewer_outcome = %s"
-        params.append(reviewer_outcome)
-    if sku_id is not None:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
-    if store_id is not None:
-        query += " AND store_id = %s"
-        params.append(store_id)
+        if reviewer_outcome:
+            query += " AND reviewer_outcome = %s"
+            params.append(reviewer_outcome)
+        if sku_id is not None:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
+        if store_id is not None:
+            query += " AND store_id = %s"
+            params.append(store_id)
 
-    query += " ORDER BY created_at DESC, id DESC LIMIT %s"
-    params.append(limit)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
 
-    cursor.close()
-    conn.close()
-    return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
 
 def log_optimization_iteration(
@@ -1176,39 +1159,35 @@ def log_optimization_iteration(
     is_selected: bool = False,
 ) -> Dict:
     """Log one iteration from offer optimization."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute(
-        """
-        INSERT INTO optimization_iterations (
-            decision_id, promotion_id, sku_id, store_id,
-            iteration_index, objective_name, objective_score,
-            candidate_offer, constraints_checked, is_selected
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(
+            """
+            INSERT INTO optimization_iterations (
+                decision_id, promotion_id, sku_id, store_id,
+                iteration_index, objective_name, objective_score,
+                candidate_offer, constraints_checked, is_selected
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, created_at
+            """,
+            (
+                decision_id,
+                promotion_id,
+                sku_id,
+                store_id,
+                iteration_index,
+                objective_name,
+                objective_score,
+                json.dumps(candidate_offer),
+                _json_dumps_if_present(constraints_checked),
+                is_selected,
+            ),
         )
-        RETURNING id, created_at
-        """,
-        (
-            decision_id,
-            promotion_id,
-            sku_id,
-            store_id,
-            iteration_index,
-            objective_name,
-            objective_score,
-            json.dumps(candidate_offer),
-            _json_dumps_if_present(constraints_checked),
-            is_selected,
-        ),
-    )
 
-    row = cursor.fetchone()
-    conn.commit()
-    cursor.close()
-    conn.close()
-    return dict(row) if row else {}
+        row = cursor.fetchone()
+        conn.commit()
+        return dict(row) if row else {}
 
 
 def get_optimization_iterations(
@@ -1218,34 +1197,30 @@ def get_optimization_iterations(
     limit: int = 100,
 ) -> List[Dict]:
     """Get optimization loop history."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT *
-        FROM optimization_iterations
-        WHERE 1=1
-    """
-    params: List[Any] = []
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT *
+            FROM optimization_iterations
+            WHERE 1=1
+        """
+        params: List[Any] = []
 
-    if sku_id is not None:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
-    if store_id is not None:
-        query += " AND store_id = %s"
-        params.append(store_id)
-    if decision_id is not None:
-        query += " AND decision_id = %s"
-        params.append(decision_id)
+        if sku_id is not None:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
+        if store_id is not None:
+            query += " AND store_id = %s"
+            params.append(store_id)
+        if decision_id is not None:
+            query += " AND decision_id = %s"
+            params.append(decision_id)
 
-    query += " ORDER BY created_at DESC, iteration_index DESC LIMIT %s"
-    params.append(limit)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+        query += " ORDER BY created_at DESC, iteration_index DESC LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
 
-    cursor.close()
-    conn.close()
-    return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
 
 def log_evaluator_score(
@@ -1261,39 +1236,37 @@ def log_evaluator_score(
     arbitration_decision: str = None,
 ) -> Dict:
     """Log evaluator output from multi-critic stage."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        _relax_commit_durability(cursor)
 
-    cursor.execute(
-        """
-        INSERT INTO evaluator_scores (
-            decision_id, promotion_id, sku_id, store_id,
-            evaluator_name, score, rationale, risk_flags,
-            recommendation, arbitration_decision
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+        cursor.execute(
+            """
+            INSERT INTO evaluator_scores (
+                decision_id, promotion_id, sku_id, store_id,
+                evaluator_name, score, rationale, risk_flags,
+                recommendation, arbitration_decision
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, created_at
+            """,
+            (
+                decision_id,
+                promotion_id,
+                sku_id,
+                store_id,
+                evaluator_name,
+                score,
+                rationale,
+                _json_dumps_if_present(risk_flags),
+                recommendation,
+                arbitration_decision,
+            ),
         )
-        RETURNING id, created_at
-        """,
-        (
-            decision_id,
-            promotion_id,
-            sku_id,
-            store_id,
-            evaluator_name,
-            score,
-            rationale,
-            _json_dumps_if_present(risk_flags),
-            recommendation,
-            arbitration_decision,
-        ),
-    )
 
-    row = cursor.fetchone()
-    conn.commit()
-    cursor.close()
-    conn.close()
-    return dict(row) if row else {}
+        row = cursor.fetchone()
+        conn.commit()
+        return dict(row) if row else {}
 
 
 def get_evaluator_scores(
@@ -1304,37 +1277,33 @@ def get_evaluator_scores(
     limit: int = 100,
 ) -> List[Dict]:
     """Fetch evaluator outputs for observability."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT *
+            FROM evaluator_scores
+            WHERE 1=1
+        """
+        params: List[Any] = []
 
-    query = """
-        SELECT *
-        FROM evaluator_scores
-        WHERE 1=1
-    """
-    params: List[Any] = []
-
-    if sku_id is not None:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
-    if store_id is not None:
-        query += " AND store_id = %s"
-        params.append(store_id)
-    if decision_id is not None:
-        query += " AND decision_id = %s"
-        params.append(decision_id)
-    if evaluator_name is not None:
-        query += " AND evaluator_name = %s"
-        params.append(evaluator_name)
-
-    query += " ORDER BY created_at DESC, id DESC LIMIT %s"
-    params.append(limit)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-    return [dict(row) for row in rows]
+        if sku_id is not None:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
+        if store_id is not None:
+            query += " AND store_id = %s"
+            params.append(store_id)
+        if decision_id is not None:
+            query += " AND decision_id = %s"
+            params.append(decision_id)
+        if evaluator_name is not None:
+            query += " AND evaluator_name = %s"
+            params.append(evaluator_name)
+
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+        return [dict(row) for row in rows]
 
 
 def upsert_embedding_metadata(
@@ -1351,39 +1320,35 @@ def upsert_embedding_metadata(
     summary: str = None,
 ) -> Dict:
     """Persist metadata describing indexed vectors."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    cursor.execute(
-        """
-        INSERT INTO embeddings_index_metadata (
-            entity_type, entity_id, sku_id, store_id, decision_id, promotion_id,
-            embedding_provider, collection_name, vector_key, source_payload, summary
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(
+            """
+            INSERT INTO embeddings_index_metadata (
+                entity_type, entity_id, sku_id, store_id, decision_id, promotion_id,
+                embedding_provider, collection_name, vector_key, source_payload, summary
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            RETURNING id, indexed_at
+            """,
+            (
+                entity_type,
+                entity_id,
+                sku_id,
+                store_id,
+                decision_id,
+                promotion_id,
+                embedding_provider,
+                collection_name,
+                vector_key,
+                _json_dumps_if_present(source_payload),
+                summary,
+            ),
         )
-        RETURNING id, indexed_at
-        """,
-        (
-            entity_type,
-            entity_id,
-            sku_id,
-            store_id,
-            decision_id,
-            promotion_id,
-            embedding_provider,
-            collection_name,
-            vector_key,
-            _json_dumps_if_present(source_payload),
-            summary,
-        ),
-    )
 
-    row = cursor.fetchone()
-    conn.commit()
-    cursor.close()
-    conn.close()
-    return dict(row) if row else {}
+        row = cursor.fetchone()
+        conn.commit()
+        return dict(row) if row else {}
 
 
 def get_embedding_metadata(
@@ -1393,34 +1358,30 @@ def get_embedding_metadata(
     limit: int = 100,
 ) -> List[Dict]:
     """Fetch embedding index metadata for diagnostics."""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        SELECT *
-        FROM embeddings_index_metadata
-        WHERE 1=1
-    """
-    params: List[Any] = []
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            SELECT *
+            FROM embeddings_index_metadata
+            WHERE 1=1
+        """
+        params: List[Any] = []
 
-    if entity_type is not None:
-        query += " AND entity_type = %s"
-        params.append(entity_type)
-    if sku_id is not None:
-        query += " AND sku_id = %s"
-        params.append(sku_id)
-    if store_id is not None:
-        query += " AND store_id = %s"
-        params.append(store_id)
+        if entity_type is not None:
+            query += " AND entity_type = %s"
+            params.append(entity_type)
+        if sku_id is not None:
+            query += " AND sku_id = %s"
+            params.append(sku_id)
+        if store_id is not None:
+            query += " AND store_id = %s"
+            params.append(store_id)
 
-    query += " ORDER BY indexed_at DESC, id DESC LIMIT %s"
-    params.append(limit)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+        query += " ORDER BY indexed_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
 
-    cursor.close()
-    conn.close()
-    return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
 
 def get_historical_promotion_cases(
@@ -1432,71 +1393,102 @@ def get_historical_promotion_cases(
     Fetch historically similar cases (same SKU first, then same category).
     This provides a deterministic fallback when vector retrieval is unavailable.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    query = """
-        WITH target_sku AS (
-            SELECT id, category
-            FROM skus
-            WHERE id = %s
-        ),
-        perf AS (
+    with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        query = """
+            WITH target_sku AS (
+                SELECT id, category
+                FROM skus
+                WHERE id = %s
+            ),
+            perf AS (
+                SELECT
+                    promotion_id,
+                    AVG(COALESCE(performance_ratio, 0)) AS avg_performance_ratio,
+                    MAX(check_time) AS last_check_time
+                FROM promotion_performance
+                GROUP BY promotion_id
+            )
             SELECT
-                promotion_id,
-                AVG(COALESCE(performance_ratio, 0)) AS avg_performance_ratio,
-                MAX(check_time) AS last_check_time
-            FROM promotion_performance
-            GROUP BY promotion_id
-        )
-        SELECT
-            p.id AS promotion_id,
-            p.sku_id,
-            p.store_id,
-            s.category,
-            p.promotion_type,
-            p.discount_type,
-            p.discount_value,
-            p.original_price,
-            p.promotional_price,
-            p.margin_percent,
-            p.expected_units_sold,
-            p.expected_revenue,
-            p.actual_units_sold,
-            p.actual_revenue,
-            p.status,
-            p.reason,
-            p.created_at,
-            COALESCE(perf.avg_performance_ratio, 0) AS avg_performance_ratio,
-            CASE WHEN p.sku_id = %s THEN 1 ELSE 0 END AS sku_similarity,
-            CASE WHEN s.category = (SELECT category FROM target_sku) THEN 1 ELSE 0 END AS category_similarity
-        FROM promotions p
-        JOIN skus s ON s.id = p.sku_id
-        LEFT JOIN perf ON perf.promotion_id = p.id
-        WHERE p.status IN ('active', 'completed', 'retracted')
-          AND (
-              p.sku_id = %s
-              OR s.category = (SELECT category FROM target_sku)
-          )
-    """
-    params: List[Any] = [sku_id, sku_id, sku_id]
-
-    if store_id is not None:
-        query += " AND p.store_id = %s"
-        params.append(store_id)
-
-    query += """
-        ORDER BY sku_similarity DESC, category_similarity DESC, avg_performance_ratio DESC, p.created_at DESC
-        LIMIT %s
-    """
-    params.append(limit)
+                p.id AS promotion_id,
+                p.sku_id,
+                p.store_id,
+                s.category,
+                p.promotion_type,
+                p.discount_type,
+                p.discount_value,
+                p.original_price,
+                p.promotional_price,
+                p.margin_percent,
+                p.expected_units_sold,
+                p.expected_revenue,
+                p.actual_units_sold,
+                p.actual_revenue,
+                p.status,
+                p.reason,
+                p.created_at,
+                COALESCE(perf.avg_performance_ratio, 0) AS avg_performance_ratio,
+                CASE WHEN p.sku_id = %s THEN 1 ELSE 0 END AS sku_similarity,
+                CASE WHEN s.category = (SELECT category FROM target_sku) THEN 1 ELSE 0 END AS category_similarity
+            FROM promotions p
+            JOIN skus s ON s.id = p.sku_id
+            LEFT JOIN perf ON perf.promotion_id = p.id
+            WHERE p.status IN ('active', 'completed', 'retracted')
+              AND (
+                  p.sku_id = %s
+                  OR s.category = (SELECT category FROM target_sku)
+              )
+        """
+        params: List[Any] = [sku_id, sku_id, sku_id]
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+        if store_id is not None:
+            query += " AND p.store_id = %s"
+            params.append(store_id)
 
-    cursor.close()
-    conn.close()
-    return [dict(row) for row in rows]
+        query += """
+            ORDER BY sku_similarity DESC, category_similarity DESC, avg_performance_ratio DESC, p.created_at DESC
+            LIMIT %s
+        """
+        params.append(limit)
+
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+        return [dict(row) for row in rows]
+
+
+# Tool name -> implementation, resolved once per request with a dict lookup
+TOOL_HANDLERS = {
+    "query_inventory_levels": query_inventory_levels,
+    "calculate_sell_through_rate": calculate_sell_through_rate,
+    "get_pricing_history": get_pricing_history,
+    "create_promotion": create_promotion,
+    "retract_promotion": retract_promotion,
+    "log_performance_metric": log_performance_metric,
+    "log_token_usage": log_token_usage,
+    "get_cost_summary": get_cost_summary,
+    "get_competitor_prices": get_competitor_prices,
+    "log_agent_decision": log_agent_decision,
+    "get_active_promotions": get_active_promotions,
+    "update_promotion_performance": update_promotion_performance,
+    "create_pending_promotion": create_pending_promotion,
+    "get_pending_promotions": get_pending_promotions,
+    "get_promotion_status_counts": get_promotion_status_counts,
+    "get_queue_snapshot": get_queue_snapshot,
+    "approve_promotion": approve_promotion,
+    "reject_promotion": reject_promotion,
+    "create_decision_prior": create_decision_prior,
+    "get_latest_decision_prior": get_latest_decision_prior,
+    "list_decision_priors": list_decision_priors,
+    "create_approval_feedback": create_approval_feedback,
+    "get_approval_feedback": get_approval_feedback,
+    "log_optimization_iteration": log_optimization_iteration,
+    "get_optimization_iterations": get_optimization_iterations,
+    "log_evaluator_score": log_evaluator_score,
+    "get_evaluator_scores": get_evaluator_scores,
+    "upsert_embedding_metadata": upsert_embedding_metadata,
+    "get_embedding_metadata": get_embedding_metadata,
+    "get_historical_promotion_cases": get_historical_promotion_cases,
+}
 
 
 # ============================================================================
@@ -1506,4 +1498,12 @@ def get_historical_promotion_cases(
 if __name__ == "__main__":
     print("Starting MCP Postgres Server...")
     print(f"Database: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
-    uvicorn.run(app, host="0.0.0.0", port=3000)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=3000,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        log_level="warning",
+    )
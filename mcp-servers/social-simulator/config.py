@@ -25,6 +25,10 @@ TRENDING_TOPICS = [
     {"name": "Protein Power", "category": "fitness", "related_skus": ["dairy", "snacks"]},
 ]
 
+# Lowercased once here so SKU matching never lowercases per request
+for _topic in TRENDING_TOPICS:
+    _topic["related_skus_lower"] = tuple(s.lower() for s in _topic["related_skus"])
+
 # Event Types
 EVENT_TYPES = {
     "sports": {
@@ -58,15 +62,24 @@ EVENT_TYPES = {
 TREND_INTENSITY_RANGE = (30, 95)  # 0-100 scale
 TREND_DURATION_HOURS_RANGE = (6, 72)  # 6 hours to 3 days
 TREND_DECAY_RATE = 0.85  # 15% decay per check (exponential)
+TREND_DECAY_BUCKETS_PER_HOUR = 4  # Decay is recomputed in 15-minute steps
+MAX_ACTIVE_TRENDS = 256  # Weakest trend is evicted beyond this (viral injection is user-triggered)
 
 # Event Parameters
 EVENT_DURATION_HOURS_RANGE = (2, 48)
 EVENT_ADVANCE_NOTICE_DAYS = (1, 14)  # Events scheduled 1-14 days ahead
+MAX_SCHEDULED_EVENTS = 256  # Earliest-starting event is dropped beyond this
 
 # Generation Frequencies
 NEW_TREND_PROBABILITY_DAILY = 0.3  # 30% chance of new trend per day
 NEW_EVENT_PROBABILITY_WEEKLY = 0.6  # 60% chance of new event per week
 
+# Persistence
+DB_FLUSH_INTERVAL_SECONDS = 0.5  # Queued trend/event rows are written at most this often
+
+# Response Caching
+RESPONSE_CACHE_TTL_SECONDS = 5.0  # How long trending/event payloads are reused between polls
+
 # Sentiment Mapping
 SENTIMENT_CATEGORIES = {
     "positive": (60, 95),
@@ -0,0 +1,28 @@
+"""
+Gunicorn settings for running the social simulator on several cores:
+
+    gunicorn server:app -c gunicorn.conf.py
+
+The default `python server.py` entrypoint stays single-process. Note that
+each worker keeps its own in-memory trends/events after the fork, so
+workers diverge over time (and each one persists the trends it generates).
+Use this when throughput matters more than a single consistent view.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:3003")
+workers = int(os.getenv("WEB_CONCURRENCY", 2 * (os.cpu_count() or 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+worker_connections = 1000
+# Build the simulator once in the master so workers fork-inherit the initial state
+preload_app = True
+
+
+def when_ready(server):
+    """Write the initial trends/events once, before any worker is forked."""
+    from simulator import social_sim
+
+    social_sim.flush_pending_writes()
+    # Pooled sockets must not be shared with forked workers
+    social_sim.close_db_pool()
@@ -3,14 +3,24 @@ MCP Server for Social Media Trends Simulation
 Provides realistic social trends and events data
 """
 
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+import asyncio
+from typing import Callable, Dict, Any, Optional
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
 from simulator import social_sim
+import config
 
 # Initialize FastAPI app
-app = FastAPI(title="MCP Social Trends Simulator", version="1.0.0")
+app = FastAPI(
+    title="MCP Social Trends Simulator",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+# Trend/event payloads repeat the same keys and categories; level 1 keeps it cheap
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
 
 
 # Pydantic models
@@ -25,9 +35,31 @@ class ToolResponse(BaseModel):
     error: Optional[str] = None
 
 
+async def _flush_writes_periodically():
+    """Drain queued trend/event rows to Postgres off the event loop."""
+    while True:
+        await asyncio.sleep(config.DB_FLUSH_INTERVAL_SECONDS)
+        if social_sim.has_pending_writes():
+            await asyncio.to_thread(social_sim.flush_pending_writes)
+
+
+@app.on_event("startup")
+async def start_write_flusher():
+    """Start the background DB writer"""
+    app.state.flush_task = asyncio.create_task(_flush_writes_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_write_flusher():
+    """Stop the background DB writer and write out anything still queued"""
+    app.state.flush_task.cancel()
+    await asyncio.to_thread(social_sim.flush_pending_writes)
+    social_sim.close_db_pool()
+
+
 # Health check endpoint
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     state = social_sim.get_state()
     return {
@@ -38,56 +70,67 @@ def health_check():
     }
 
 
+# MCP tool handlers: each takes the raw parameters dict
+def _check_sku_sentiment(parameters: Dict[str, Any]) -> Any:
+    sku_category = parameters.get("sku_category")
+    if not sku_category:
+        raise ValueError("sku_category is required")
+    return social_sim.check_sku_sentiment(sku_category)
+
+
+def _inject_viral_moment(parameters: Dict[str, Any]) -> Any:
+    topic = parameters.get("topic")
+    intensity = parameters.get("intensity", 80)
+    if not topic:
+        raise ValueError("topic is required")
+    return social_sim.inject_viral_moment(topic, intensity)
+
+
+def _create_event(parameters: Dict[str, Any]) -> Any:
+    event_name = parameters.get("event_name")
+    event_type = parameters.get("event_type")
+    location_id = parameters.get("location_id")
+    start_time = parameters.get("start_time")
+    attendance = parameters.get("attendance", 1000)
+    if not all([event_name, event_type, location_id, start_time]):
+        raise ValueError(
+            "event_name, event_type, location_id, and start_time are required"
+        )
+    return social_sim.create_event(
+        event_name, event_type, location_id, start_time, attendance
+    )
+
+
+TOOL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "get_trending_topics": lambda p: social_sim.get_trending_topics(p.get("location_id")),
+    "get_event_calendar": lambda p: social_sim.get_event_calendar(
+        p.get("location_id"), p.get("days_ahead", 7)
+    ),
+    "check_sku_sentiment": _check_sku_sentiment,
+    "inject_viral_moment": _inject_viral_moment,
+    "create_event": _create_event,
+    "get_simulator_state": lambda p: social_sim.get_state(),
+}
+
+# Tools that queue DB writes; their rows are flushed right after the response
+PERSISTING_TOOLS = {"inject_viral_moment", "create_event"}
+
+
 # MCP Tool endpoint
 @app.post("/tool", response_model=ToolResponse)
-def execute_tool(request: ToolRequest):
+async def execute_tool(request: ToolRequest, background_tasks: BackgroundTasks):
     """Execute an MCP tool"""
     tool_name = request.tool_name
-    parameters = request.parameters
 
     try:
-        if tool_name == "get_trending_topics":
-            location_id = parameters.get("location_id")
-            result = social_sim.get_trending_topics(location_id)
-
-        elif tool_name == "get_event_calendar":
-            location_id = parameters.get("location_id")
-            days_ahead = parameters.get("days_ahead", 7)
-            result = social_sim.get_event_calendar(location_id, days_ahead)
-
-        elif tool_name == "check_sku_sentiment":
-            sku_category = parameters.get("sku_category")
-            if not sku_category:
-                raise ValueError("sku_category is required")
-            result = social_sim.check_sku_sentiment(sku_category)
-
-        elif tool_name == "inject_viral_moment":
-            topic = parameters.get("topic")
-            intensity = parameters.get("intensity", 80)
-            if not topic:
-                raise ValueError("topic is required")
-            result = social_sim.inject_viral_moment(topic, intensity)
-
-        elif tool_name == "create_event":
-            event_name = parameters.get("event_name")
-            event_type = parameters.get("event_type")
-            location_id = parameters.get("location_id")
-            start_time = parameters.get("start_time")
-            attendance = parameters.get("attendance", 1000)
-            if not all([event_name, event_type, location_id, start_time]):
-                raise ValueError(
-                    "event_name, event_type, location_id, and start_time are required"
-                )
-            result = social_sim.create_event(
-                event_name, event_type, location_id, start_time, attendance
-            )
-
-        elif tool_name == "get_simulator_state":
-            result = social_sim.get_state()
-
-        else:
+        handler = TOOL_HANDLERS.get(tool_name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {tool_name}")
 
+        result = handler(request.parameters)
+        if tool_name in PERSISTING_TOOLS:
+            background_tasks.add_task(social_sim.flush_pending_writes)
+
         return ToolResponse(success=True, data=result)
 
     except Exception as e:
@@ -96,31 +139,34 @@ def execute_tool(request: ToolRequest):
 
 # Additional REST endpoints for UI control
 @app.get("/trending")
-def get_trending(location_id: Optional[int] = None):
+async def get_trending(location_id: Optional[int] = None):
     """Get trending topics"""
     return social_sim.get_trending_topics(location_id)
 
 
 @app.get("/events")
-def get_events(location_id: Optional[int] = None, days_ahead: int = 7):
+async def get_events(location_id: Optional[int] = None, days_ahead: int = 7):
     """Get event calendar"""
     return social_sim.get_event_calendar(location_id, days_ahead)
 
 
 @app.get("/sentiment/{category}")
-def get_sentiment(category: str):
+async def get_sentiment(category: str):
     """Get SKU category sentiment"""
     return social_sim.check_sku_sentiment(category)
 
 
 @app.post("/viral")
-def inject_viral(topic: str, intensity: int = 80):
+async def inject_viral(topic: str, background_tasks: BackgroundTasks, intensity: int = 80):
     """Inject viral moment"""
-    return social_sim.inject_viral_moment(topic, intensity)
+    result = social_sim.inject_viral_moment(topic, intensity)
+    # Persist right after the response is sent instead of waiting for the next flush tick
+    background_tasks.add_task(social_sim.flush_pending_writes)
+    return result
 
 
 @app.get("/state")
-def get_state():
+async def get_state():
     """Get simulator state"""
     return social_sim.get_state()
 
@@ -134,4 +180,12 @@ if __name__ == "__main__":
     state = social_sim.get_state()
     print(f"Active trends: {state['active_trends_count']}")
     print(f"Scheduled events: {state['scheduled_events_count']}")
-    uvicorn.run(app, host="0.0.0.0", port=3003)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=3003,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        log_level="warning",
+    )
@@ -3,21 +3,64 @@ Social Media Trends Simulation Engine
 Simulates trending topics, events, and social media buzz
 """
 
+import bisect
+import heapq
 import random
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 import config
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import json
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+import orjson
+
+INSERT_EXTERNAL_FACTORS_SQL = """
+    INSERT INTO external_factors
+    (factor_type, factor_name, store_id, factor_value, intensity, start_date, end_date)
+    VALUES %s
+"""
+_HOURS_PER_SECOND = 1 / 3600
+_SENTIMENT_TYPES = ("positive", "neutral", "negative")
+_SENTIMENT_WEIGHTS = (0.6, 0.3, 0.1)
+_EVENT_TYPE_NAMES = tuple(config.EVENT_TYPES)
+
+
+def _iso(ts: float) -> str:
+    """Format an epoch timestamp as a local ISO-8601 string"""
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def _inclusive_range(bounds: tuple) -> range:
+    """range() covering both ends of a (low, high) config tuple, like randint"""
+    return range(bounds[0], bounds[1] + 1)
 
 
 class SocialSimulator:
     def __init__(self):
         self.active_trends = []
+        # Lowercased SKU category -> {trend_id: trend}, kept in sync with active_trends
+        self._sku_index: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        # Earliest end_mono among active_trends; nothing can expire before it
+        self._next_trend_expiry: Optional[float] = None
+        # Min-heap of (intensity, id, trend) over active_trends, used to evict at the cap
+        self._trend_heap: List[tuple] = []
+        # Kept sorted by start_ts; _event_starts mirrors those values for bisect
         self.scheduled_events = []
+        self._event_starts: List[float] = []
         self.forced_virals = []
+        # Short-lived response caches: key -> (expires_at_monotonic, payload)
+        self._trend_cache: Dict[tuple, tuple] = {}
+        self._event_cache: Dict[tuple, tuple] = {}
+        # Rows waiting to be written to external_factors (see flush_pending_writes)
+        self._pending_trends: List[tuple] = []
+        self._pending_events: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        # Created on first flush so the simulator still starts while Postgres is down
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
         self.db_config = {
             "host": os.getenv("DB_HOST", "postgres"),
             "port": int(os.getenv("DB_PORT", 5432)),
@@ -29,184 +72,290 @@ class SocialSimulator:
         self._initialize_events()
 
     def get_db_connection(self):
-        """Get database connection"""
-        return psycopg2.connect(**self.db_config)
+        """Borrow a database connection from the pool"""
+        if self.pool is None:
+            with self._pool_lock:
+                if self.pool is None:
+                    self.pool = ThreadedConnectionPool(minconn=2, maxconn=10, **self.db_config)
+        return self.pool.getconn()
+
+    def put_db_connection(self, conn, close: bool = False):
+        """Return a borrowed connection to the pool"""
+        self.pool.putconn(conn, close=close)
+
+    def close_db_pool(self):
+        """Close all pooled connections"""
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
 
     def write_trend_to_db(self, trend: Dict[str, Any]) -> bool:
-        """Write trend data to external_factors table"""
-        try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-
-            # Prepare factor_value JSON
-            factor_value = {
-                "platform": trend["platform"],
-                "category": trend["category"],
-                "sentiment_score": trend["sentiment_score"],
-                "sentiment_type": trend["sentiment_type"],
-                "mentions": trend["mentions"],
-                "related_skus": trend["related_skus"],
-                "is_viral": trend["is_viral"]
-            }
+        """Queue trend data for the external_factors table"""
+        # Prepare factor_value JSON
+        factor_value = {
+            "platform": trend["platform"],
+            "category": trend["category"],
+            "sentiment_score": trend["sentiment_score"],
+            "sentiment_type": trend["sentiment_type"],
+            "mentions": trend["mentions"],
+            "related_skus": trend["related_skus"],
+            "is_viral": trend["is_viral"]
+        }
 
-            query = """
-                INSERT INTO external_factors
-                (factor_type, factor_name, store_id, factor_value, intensity, start_date, end_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(query, (
-                "trend",
-                trend["name"],
-                None,  # Trends are not store-specific
-                json.dumps(factor_value),
-                trend["intensity"],
-                trend["start_time"],
-                trend["end_time"]
-            ))
+        row = (
+            "trend",
+            trend["name"],
+            None,  # Trends are not store-specific
+            orjson.dumps(factor_value).decode(),
+            trend["intensity"],
+            _iso(trend["start_ts"]),
+            _iso(trend["start_ts"] + trend["end_mono"] - trend["start_mono"])
+        )
+        with self._pending_lock:
+            self._pending_trends.append(row)
+        return True
 
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return True
+    def write_event_to_db(self, event: Dict[str, Any]) -> bool:
+        """Queue event data for the external_factors table"""
+        # Prepare factor_value JSON
+        factor_value = {
+            "event_type": event["event_type"],
+            "expected_attendance": event["expected_attendance"],
+            "impact_categories": event["impact_categories"],
+            "location_id": event["location_id"]
+        }
 
-        except Exception as e:
-            print(f"Error writing trend to DB: {e}")
-            return False
+        # Calculate intensity based on attendance
+        attendance = event["expected_attendance"]
+        if attendance >= 5000:
+            intensity = 85
+        elif attendance >= 2000:
+            intensity = 70
+        elif attendance >= 1000:
+            intensity = 60
+        else:
+            intensity = 50
+
+        row = (
+            "event",
+            event["name"],
+            event["location_id"],
+            orjson.dumps(factor_value).decode(),
+            intensity,
+            event["start_iso"],
+            event["end_iso"]
+        )
+        with self._pending_lock:
+            self._pending_events.append(row)
+        return True
+
+    def has_pending_writes(self) -> bool:
+        """Whether any trend/event rows are waiting to be flushed"""
+        return bool(self._pending_trends or self._pending_events)
+
+    def flush_pending_writes(self) -> int:
+        """
+        Write all queued trend/event rows in a single transaction.
+        Blocking; the server runs this off the event loop on a timer so
+        request handlers never wait on Postgres.
+        """
+        with self._pending_lock:
+            rows = self._pending_trends + self._pending_events
+            self._pending_trends = []
+            self._pending_events = []
+
+        if not rows:
+            return 0
 
-    def write_event_to_db(self, event: Dict[str, Any]) -> bool:
-        """Write event data to external_factors table"""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-
-            # Prepare factor_value JSON
-            factor_value = {
-                "event_type": event["event_type"],
-                "expected_attendance": event["expected_attendance"],
-                "impact_categories": event["impact_categories"],
-                "location_id": event["location_id"]
-            }
-
-            # Calculate intensity based on attendance
-            attendance = event["expected_attendance"]
-            if attendance >= 5000:
-                intensity = 85
-            elif attendance >= 2000:
-                intensity = 70
-            elif attendance >= 1000:
-                intensity = 60
-            else:
-                intensity = 50
-
-            query = """
-                INSERT INTO external_factors
-                (factor_type, factor_name, store_id, factor_value, intensity, start_date, end_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(query, (
-                "event",
-                event["name"],
-                event["location_id"],
-                json.dumps(factor_value),
-                intensity,
-                event["start_time"],
-                event["end_time"]
-            ))
+        except Exception as e:
+            print(f"Error writing {len(rows)} trend/event rows to DB: {e}")
+            return 0
 
+        try:
+            with conn.cursor() as cursor:
+                # One multi-row INSERT instead of a statement per row
+                execute_values(cursor, INSERT_EXTERNAL_FACTORS_SQL, rows, page_size=len(rows))
             conn.commit()
-            cursor.close()
-            conn.close()
-            return True
+            self.put_db_connection(conn)
+            return len(rows)
 
         except Exception as e:
-            print(f"Error writing event to DB: {e}")
-            return False
+            print(f"Error writing {len(rows)} trend/event rows to DB: {e}")
+            # Don't hand a connection in an unknown state back to the pool
+            self.put_db_connection(conn, close=True)
+            return 0
+
+    def _add_trend(self, trend: Dict[str, Any]):
+        """Register a trend as active and index it by related SKU category"""
+        if len(self.active_trends) >= config.MAX_ACTIVE_TRENDS:
+            self._evict_weakest_trend()
+        self.active_trends.append(trend)
+        heapq.heappush(self._trend_heap, (trend["intensity"], trend["id"], trend))
+        if self._next_trend_expiry is None or trend["end_mono"] < self._next_trend_expiry:
+            self._next_trend_expiry = trend["end_mono"]
+        for sku_key in trend["related_skus_lower"]:
+            self._sku_index[sku_key][trend["id"]] = trend
+        self._trend_cache.clear()
+
+    def _evict_weakest_trend(self):
+        """Drop the lowest-intensity active trend to stay within MAX_ACTIVE_TRENDS"""
+        _, _, weakest = heapq.heappop(self._trend_heap)
+        self.active_trends.remove(weakest)
+        self._unindex_trend(weakest)
+
+    def _unindex_trend(self, trend: Dict[str, Any]):
+        """Drop an expired trend from the SKU index"""
+        for sku_key in trend["related_skus_lower"]:
+            matches = self._sku_index.get(sku_key)
+            if matches is not None:
+                matches.pop(trend["id"], None)
+                if not matches:
+                    del self._sku_index[sku_key]
+
+    def _add_event(self, event: Dict[str, Any]):
+        """Insert an event keeping scheduled_events ordered by start_ts"""
+        if len(self.scheduled_events) >= config.MAX_SCHEDULED_EVENTS:
+            del self._event_starts[0]
+            del self.scheduled_events[0]
+        start_ts = event["start_ts"]
+        idx = bisect.bisect_right(self._event_starts, start_ts)
+        self._event_starts.insert(idx, start_ts)
+        self.scheduled_events.insert(idx, event)
+        self._event_cache.clear()
 
     def _initialize_trends(self):
         """Initialize with some active trends"""
-        # Start with 2-3 random trends
+        # Start with 2-3 random trends, drawing each attribute for all of them at once
         num_initial_trends = random.randint(2, 3)
-        for _ in range(num_initial_trends):
-            self._generate_new_trend()
+        topics = random.choices(config.TRENDING_TOPICS, k=num_initial_trends)
+        intensities = random.choices(
+            _inclusive_range(config.TREND_INTENSITY_RANGE), k=num_initial_trends
+        )
+        durations = random.choices(
+            _inclusive_range(config.TREND_DURATION_HOURS_RANGE), k=num_initial_trends
+        )
+        platforms = random.choices(config.PLATFORMS, k=num_initial_trends)
+        sentiment_types = random.choices(
+            _SENTIMENT_TYPES, weights=_SENTIMENT_WEIGHTS, k=num_initial_trends
+        )
+        for args in zip(topics, intensities, durations, platforms, sentiment_types):
+            self._generate_new_trend(*args)
 
     def _initialize_events(self):
         """Initialize with some scheduled events"""
-        # Create 5-7 upcoming events
+        # Create 5-7 upcoming events, drawing each attribute for all of them at once
         num_initial_events = random.randint(5, 7)
-        for _ in range(num_initial_events):
-            self._generate_new_event()
+        event_types = random.choices(_EVENT_TYPE_NAMES, k=num_initial_events)
+        durations = random.choices(
+            _inclusive_range(config.EVENT_DURATION_HOURS_RANGE), k=num_initial_events
+        )
+        days_ahead = random.choices(
+            _inclusive_range(config.EVENT_ADVANCE_NOTICE_DAYS), k=num_initial_events
+        )
+        for args in zip(event_types, durations, days_ahead):
+            self._generate_new_event(None, *args)
 
-    def _generate_new_trend(self) -> Dict[str, Any]:
-        """Generate a new trending topic"""
-        topic = random.choice(config.TRENDING_TOPICS)
-        intensity = random.randint(*config.TREND_INTENSITY_RANGE)
-        duration_hours = random.randint(*config.TREND_DURATION_HOURS_RANGE)
-        platform = random.choice(config.PLATFORMS)
+    def _generate_new_trend(
+        self,
+        topic: Optional[Dict[str, Any]] = None,
+        intensity: Optional[int] = None,
+        duration_hours: Optional[int] = None,
+        platform: Optional[str] = None,
+        sentiment_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Generate a new trending topic; attributes not supplied are drawn at random"""
+        if topic is None:
+            topic = random.choice(config.TRENDING_TOPICS)
+        if intensity is None:
+            intensity = random.randint(*config.TREND_INTENSITY_RANGE)
+        if duration_hours is None:
+            duration_hours = random.randint(*config.TREND_DURATION_HOURS_RANGE)
+        if platform is None:
+            platform = random.choice(config.PLATFORMS)
 
         # Determine sentiment
-        sentiment_type = random.choices(
-            ["positive", "neutral", "negative"], weights=[0.6, 0.3, 0.1], k=1
-        )[0]
+        if sentiment_type is None:
+            sentiment_type = random.choices(
+                _SENTIMENT_TYPES, weights=_SENTIMENT_WEIGHTS, k=1
+            )[0]
         sentiment_range = config.SENTIMENT_CATEGORIES[sentiment_type]
         sentiment_score = random.randint(*sentiment_range)
 
         # Mentions count based on intensity
         mentions = int((intensity / 100) * random.randint(5000, 50000))
 
+        now_ts = time.time()
+        now_mono = time.monotonic()
         trend = {
-            "id": f"trend_{datetime.now().timestamp()}_{random.randint(1000, 9999)}",
+            "id": f"trend_{now_ts}_{random.randint(1000, 9999)}",
             "name": topic["name"],
             "category": topic["category"],
             "related_skus": topic["related_skus"],
+            "related_skus_lower": topic["related_skus_lower"],
             "platform": platform,
             "intensity": intensity,
             "sentiment_score": sentiment_score,
             "sentiment_type": sentiment_type,
             "mentions": mentions,
-            "start_time": datetime.now(),
-            "end_time": datetime.now() + timedelta(hours=duration_hours),
+            # Wall-clock start for the DB row; expiry/decay run on the monotonic clock
+            "start_ts": now_ts,
+            "start_mono": now_mono,
+            "end_mono": now_mono + duration_hours * 3600,
             "is_viral": False,
         }
 
-        self.active_trends.append(trend)
+        self._add_trend(trend)
 
         # Write to database
         self.write_trend_to_db(trend)
 
         return trend
 
-    def _generate_new_event(self, location_id: Optional[int] = None) -> Dict[str, Any]:
-        """Generate a new scheduled event"""
-        event_type = random.choice(list(config.EVENT_TYPES.keys()))
+    def _generate_new_event(
+        self,
+        location_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        duration_hours: Optional[int] = None,
+        days_ahead: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Generate a new scheduled event; attributes not supplied are drawn at random"""
+        if event_type is None:
+            event_type = random.choice(_EVENT_TYPE_NAMES)
         event_config = config.EVENT_TYPES[event_type]
 
         event_name = random.choice(event_config["examples"])
         attendance = random.randint(*event_config["attendance_range"])
-        duration_hours = random.randint(*config.EVENT_DURATION_HOURS_RANGE)
-        days_ahead = random.randint(*config.EVENT_ADVANCE_NOTICE_DAYS)
+        if duration_hours is None:
+            duration_hours = random.randint(*config.EVENT_DURATION_HOURS_RANGE)
+        if days_ahead is None:
+            days_ahead = random.randint(*config.EVENT_ADVANCE_NOTICE_DAYS)
 
-        start_time = datetime.now() + timedelta(days=days_ahead)
-        end_time = start_time + timedelta(hours=duration_hours)
+        now_ts = time.time()
+        start_ts = now_ts + days_ahead * 86400
+        end_ts = start_ts + duration_hours * 3600
 
         # Random location if not specified
         if location_id is None:
             location_id = random.randint(1, 5)
 
         event = {
-            "id": f"event_{datetime.now().timestamp()}_{random.randint(1000, 9999)}",
+            "id": f"event_{now_ts}_{random.randint(1000, 9999)}",
             "name": event_name,
             "event_type": event_type,
             "location_id": location_id,
             "expected_attendance": attendance,
             "impact_categories": event_config["impact_categories"],
-            "start_time": start_time,
-            "end_time": end_time,
-            "created_at": datetime.now(),
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            # ISO strings are built once here and reused by every calendar response
+            "start_iso": _iso(start_ts),
+            "end_iso": _iso(end_ts),
+            "created_ts": now_ts,
         }
 
-        self.scheduled_events.append(event)
+        self._add_event(event)
 
         # Write to database
         self.write_event_to_db(event)
@@ -217,28 +366,46 @@ class SocialSimulator:
         self, location_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Get currently trending topics"""
-        now = datetime.now()
+        cache_key = (location_id,)
+        now_mono = time.monotonic()
+        cached = self._trend_cache.get(cache_key)
+        if cached and now_mono < cached[0]:
+            return cached[1]
+
+        # Remove expired trends, but only rebuild the list once one has actually expired
+        if self._next_trend_expiry is not None and now_mono >= self._next_trend_expiry:
+            active = []
+            for trend in self.active_trends:
+                if now_mono < trend["end_mono"]:
+                    active.append(trend)
+                else:
+                    self._unindex_trend(trend)
+            self.active_trends = active
+            self._trend_heap = [(t["intensity"], t["id"], t) for t in active]
+            heapq.heapify(self._trend_heap)
+            self._next_trend_expiry = min(
+                (t["end_mono"] for t in active), default=None
+            )
 
-        # Update trends - remove expired, decay intensity
-        active = []
+        # Apply decay, only recomputing when a trend enters a new step
         for trend in self.active_trends:
-            if now < trend["end_time"]:
-                # Apply decay
-                hours_elapsed = (now - trend["start_time"]).total_seconds() / 3600
-                decay_factor = config.TREND_DECAY_RATE ** (hours_elapsed / 24)
+            hours_elapsed = (now_mono - trend["start_mono"]) * _HOURS_PER_SECOND
+            bucket = int(hours_elapsed * config.TREND_DECAY_BUCKETS_PER_HOUR)
+            if trend.get("_decay_bucket") != bucket:
+                decay_factor = config.TREND_DECAY_RATE ** (
+                    bucket / (24 * config.TREND_DECAY_BUCKETS_PER_HOUR)
+                )
+                trend["_decay_bucket"] = bucket
                 trend["current_intensity"] = max(
                     10, int(trend["intensity"] * decay_factor)
                 )
-                active.append(trend)
-
-        self.active_trends = active
 
         # Maybe generate new trend
         if random.random() < (config.NEW_TREND_PROBABILITY_DAILY / 24):
             self._generate_new_trend()
 
         # Format for output
-        return [
+        trends = [
             {
                 "name": t["name"],
                 "category": t["category"],
@@ -250,25 +417,33 @@ class SocialSimulator:
                 "mentions": t["mentions"],
                 "is_viral": t["is_viral"],
                 "time_remaining_hours": round(
-                    (t["end_time"] - now).total_seconds() / 3600, 1
+                    (t["end_mono"] - now_mono) * _HOURS_PER_SECOND, 1
                 ),
             }
             for t in self.active_trends
         ]
+        self._trend_cache[cache_key] = (
+            now_mono + config.RESPONSE_CACHE_TTL_SECONDS,
+            trends,
+        )
+        return trends
 
     def get_event_calendar(
         self, location_id: Optional[int] = None, days_ahead: int = 7
     ) -> List[Dict[str, Any]]:
         """Get upcoming events"""
-        now = datetime.now()
-        cutoff = now + timedelta(days=days_ahead)
-
-        # Filter events
-        upcoming = [
-            e
-            for e in self.scheduled_events
-            if e["start_time"] <= cutoff and e["start_time"] >= now
-        ]
+        cache_key = (location_id, days_ahead)
+        cached = self._event_cache.get(cache_key)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+
+        now_ts = time.time()
+        cutoff_ts = now_ts + days_ahead * 86400
+
+        # Slice the [now, cutoff] window out of the sorted schedule
+        lo = bisect.bisect_left(self._event_starts, now_ts)
+        hi = bisect.bisect_right(self._event_starts, cutoff_ts)
+        upcoming = self.scheduled_events[lo:hi]
 
         # Filter by location if specified
         if location_id:
@@ -279,27 +454,33 @@ class SocialSimulator:
             self._generate_new_event(location_id)
 
         # Format for output
-        return [
+        events = [
             {
                 "name": e["name"],
                 "event_type": e["event_type"],
                 "location_id": e["location_id"],
                 "expected_attendance": e["expected_attendance"],
                 "impact_categories": e["impact_categories"],
-                "start_time": e["start_time"].isoformat(),
-                "end_time": e["end_time"].isoformat(),
-                "days_until": (e["start_time"] - now).days,
-                "hours_until": round((e["start_time"] - now).total_seconds() / 3600, 1),
+                "start_time": e["start_iso"],
+                "end_time": e["end_iso"],
+                "days_until": int((e["start_ts"] - now_ts) // 86400),
+                "hours_until": round((e["start_ts"] - now_ts) * _HOURS_PER_SECOND, 1),
             }
-            for e in sorted(upcoming, key=lambda x: x["start_time"])
+            for e in upcoming
         ]
+        self._event_cache[cache_key] = (
+            time.monotonic() + config.RESPONSE_CACHE_TTL_SECONDS,
+            events,
+        )
+        return events
 
     def check_sku_sentiment(self, sku_category: str) -> Dict[str, Any]:
         """Check sentiment/buzz for a SKU category"""
+        now_mono = time.monotonic()
         relevant_trends = [
             t
-            for t in self.active_trends
-            if sku_category.lower() in [s.lower() for s in t["related_skus"]]
+            for t in self._sku_index.get(sku_category.lower(), {}).values()
+            if now_mono < t["end_mono"]
         ]
 
         if not relevant_trends:
@@ -339,22 +520,26 @@ class SocialSimulator:
             raise ValueError("Viral moment intensity must be between 50 and 100")
 
         # Create high-impact trend
+        now_ts = time.time()
+        now_mono = time.monotonic()
         viral_trend = {
-            "id": f"viral_{datetime.now().timestamp()}_{random.randint(1000, 9999)}",
+            "id": f"viral_{now_ts}_{random.randint(1000, 9999)}",
             "name": topic,
             "category": "viral",
             "related_skus": ["all"],
+            "related_skus_lower": ("all",),
             "platform": random.choice(config.PLATFORMS),
             "intensity": intensity,
             "sentiment_score": random.randint(70, 95),
             "sentiment_type": "positive",
             "mentions": int((intensity / 100) * random.randint(50000, 200000)),
-            "start_time": datetime.now(),
-            "end_time": datetime.now() + timedelta(hours=48),
+            "start_ts": now_ts,
+            "start_mono": now_mono,
+            "end_mono": now_mono + 48 * 3600,
             "is_viral": True,
         }
 
-        self.active_trends.append(viral_trend)
+        self._add_trend(viral_trend)
         self.forced_virals.append(viral_trend["id"])
 
         # Write to database
@@ -365,7 +550,7 @@ class SocialSimulator:
             "intensity": intensity,
             "mentions": viral_trend["mentions"],
             "platform": viral_trend["platform"],
-            "injected_at": datetime.now().isoformat(),
+            "injected_at": _iso(now_ts),
             "status": "active",
         }
 
@@ -385,21 +570,25 @@ class SocialSimulator:
 
         event_config = config.EVENT_TYPES[event_type]
         start_dt = datetime.fromisoformat(start_time)
-        end_dt = start_dt + timedelta(hours=random.randint(2, 6))
+        start_ts = start_dt.timestamp()
+        end_ts = start_ts + random.randint(2, 6) * 3600
+        now_ts = time.time()
 
         event = {
-            "id": f"custom_{datetime.now().timestamp()}_{random.randint(1000, 9999)}",
+            "id": f"custom_{now_ts}_{random.randint(1000, 9999)}",
             "name": event_name,
             "event_type": event_type,
             "location_id": location_id,
             "expected_attendance": attendance,
             "impact_categories": event_config["impact_categories"],
-            "start_time": start_dt,
-            "end_time": end_dt,
-            "created_at": datetime.now(),
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "start_iso": start_dt.isoformat(),
+            "end_iso": _iso(end_ts),
+            "created_ts": now_ts,
         }
 
-        self.scheduled_events.append(event)
+        self._add_event(event)
 
         # Write to database
         self.write_event_to_db(event)
@@ -409,7 +598,7 @@ class SocialSimulator:
             "event_type": event_type,
             "location_id": location_id,
             "start_time": start_dt.isoformat(),
-            "created_at": datetime.now().isoformat(),
+            "created_at": _iso(now_ts),
             "status": "scheduled",
         }
 
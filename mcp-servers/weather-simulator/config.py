@@ -54,3 +54,13 @@ HUMIDITY_RANGES = {
     "snowy": (60, 80),
     "foggy": (80, 95),
 }
+
+# Persistence
+DB_FLUSH_INTERVAL_SECONDS = 1.0  # Queued weather rows are written at most this often
+DB_COPY_MIN_ROWS = 1024  # Batches at least this large are loaded with COPY instead of INSERT
+DB_MAX_PENDING_ROWS = 50000  # Oldest queued rows are dropped beyond this (e.g. while Postgres is down)
+UNCHANGED_WEATHER_REWRITE_SECONDS = 900  # An unchanged reading is still re-written this often
+
+# Current-weather cache
+WEATHER_CACHE_TTL_SECONDS = 5.0  # Calls for the same location within this window share one reading
+WEATHER_CACHE_MAX_ENTRIES = 1024  # Expired entries are pruned once the cache reaches this size
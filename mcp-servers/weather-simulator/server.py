@@ -3,12 +3,14 @@ MCP Server for Weather Simulation
 Provides realistic weather data for pricing decisions
 """
 
+import asyncio
 import os
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
 from simulator import weather_sim
+import config
 
 # Initialize FastAPI app
 app = FastAPI(title="MCP Weather Simulator", version="1.0.0")
@@ -26,9 +28,31 @@ class ToolResponse(BaseModel):
     error: Optional[str] = None
 
 
+async def _flush_writes_periodically():
+    """Drain queued weather rows to Postgres off the event loop."""
+    while True:
+        await asyncio.sleep(config.DB_FLUSH_INTERVAL_SECONDS)
+        if weather_sim.has_pending_writes():
+            await asyncio.to_thread(weather_sim.flush_pending_writes)
+
+
+@app.on_event("startup")
+async def start_write_flusher():
+    """Start the background DB writer"""
+    app.state.flush_task = asyncio.create_task(_flush_writes_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_write_flusher():
+    """Stop the background DB writer and write out anything still queued"""
+    app.state.flush_task.cancel()
+    await asyncio.to_thread(weather_sim.flush_pending_writes)
+    weather_sim.close_db_pool()
+
+
 # Health check endpoint
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
@@ -39,7 +63,7 @@ def health_check():
 
 # MCP Tool endpoint
 @app.post("/tool", response_model=ToolResponse)
-def execute_tool(request: ToolRequest):
+async def execute_tool(request: ToolRequest):
     """Execute an MCP tool"""
     tool_name = request.tool_name
     parameters = request.parameters
@@ -82,25 +106,25 @@ def execute_tool(request: ToolRequest):
 
 # Additional REST endpoints for UI control
 @app.get("/weather/{location_id}")
-def get_weather(location_id: int):
+async def get_weather(location_id: int):
     """Get current weather for a location"""
     return weather_sim.get_current_weather(location_id)
 
 
 @app.get("/forecast/{location_id}")
-def get_forecast(location_id: int, hours: int = 24):
+async def get_forecast(location_id: int, hours: int = 24):
     """Get weather forecast"""
     return weather_sim.get_weather_forecast(location_id, hours)
 
 
 @app.post("/scenario")
-def set_scenario(location_id: int, scenario: str, duration_hours: int = 24):
+async def set_scenario(location_id: int, scenario: str, duration_hours: int = 24):
     """Set weather scenario"""
     return weather_sim.set_weather_scenario(location_id, scenario, duration_hours)
 
 
 @app.get("/state")
-def get_state():
+async def get_state():
     """Get simulator state"""
     return weather_sim.get_state()
 
@@ -3,21 +3,159 @@ Weather Simulation Engine
 Generates realistic weather data with controllable scenarios
 """
 
+import bisect
+import csv
+import io
+import itertools
 import random
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import config
 import math
 import os
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
-import json
+import psycopg2.extensions
+from psycopg2.extras import Json, RealDictCursor, execute_batch
+from psycopg2.pool import ThreadedConnectionPool
+
+EXTERNAL_FACTORS_COLUMNS = (
+    "factor_type, factor_name, store_id, factor_value, intensity, start_date, end_date"
+)
+
+# Prepared once per pooled connection and reused for every small-batch flush
+PREPARE_WEATHER_INSERT_SQL = (
+    "PREPARE weather_ins (varchar, varchar, integer, jsonb, numeric, timestamp, timestamp) AS "
+    f"INSERT INTO external_factors ({EXTERNAL_FACTORS_COLUMNS}) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7)"
+)
+
+# Weather rows are valid for an hour from when they're recorded
+_ONE_HOUR = timedelta(hours=1)
+
+# Position of factor_value in a queued row (see EXTERNAL_FACTORS_COLUMNS)
+_FACTOR_VALUE_INDEX = 3
+
+
+def _json_dumps(value: Any) -> str:
+    """orjson-backed encoder for factor_value, both as a Json adapter and for COPY"""
+    return orjson.dumps(value).decode()
+
+
+def _condition_entry(temperature: float) -> tuple:
+    """(conditions, cumulative weights, humidity range per condition) for a temperature"""
+    weights = config.get_condition_weights(temperature)
+    conditions = tuple(weights)
+    humidity_ranges = tuple(config.HUMIDITY_RANGES.get(condition, (40, 60)) for condition in conditions)
+    return conditions, tuple(itertools.accumulate(weights.values())), humidity_ranges
+
+
+# Condition weights per whole degree. get_condition_weights only changes at
+# integer thresholds, so floor(temperature) always lands on the right entry.
+_COND_TABLE = {bucket: _condition_entry(bucket) for bucket in range(-30, 61)}
+
+
+def _lookup_conditions(temperature: float) -> tuple:
+    """Table entry for a temperature, computed directly outside the table's range"""
+    entry = _COND_TABLE.get(math.floor(temperature))
+    return entry if entry is not None else _condition_entry(temperature)
+
+
+# Season for each month, indexed by month - 1
+_SEASON_BY_MONTH = (
+    "winter", "winter",
+    "spring", "spring", "spring",
+    "summer", "summer", "summer",
+    "fall", "fall", "fall",
+    "winter",
+)
+
+# Scenarios that pin the temperature to a fixed range instead of the seasonal walk
+_FORCED_TEMPERATURE_RANGES = {"heatwave": (36, 42), "cold_snap": (-5, 5)}
+
+# Each thread draws from its own generator instead of the shared module-level one
+_rng_local = threading.local()
+
+
+def _rng() -> random.Random:
+    """This thread's random generator, created on first use"""
+    rng = getattr(_rng_local, "rng", None)
+    if rng is None:
+        rng = _rng_local.rng = random.Random()
+    return rng
+
+
+def _pick_index(cum_weights: tuple, rng: random.Random) -> int:
+    """Weighted pick over cumulative weights; the k=1 case of random.choices without its overhead"""
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1], 0, len(cum_weights) - 1)
+
+
+def _sample_sky(temperature: float) -> tuple:
+    """Draw (condition, humidity) for a temperature from one table entry"""
+    conditions, cum_weights, humidity_ranges = _lookup_conditions(temperature)
+    rng = _rng()
+    index = _pick_index(cum_weights, rng)
+    return conditions[index], rng.randint(*humidity_ranges[index])
+
+
+def _walk_temperature(season: str, last_temp: Optional[float]) -> float:
+    """
+    One step of the seasonal random walk. Pure: callers decide whether the
+    result becomes the location's new baseline.
+    """
+    rng = _rng()
+
+    # Get base temperature for season
+    season_config = config.SEASON_BASE_TEMPS[season]
+    base_temp = season_config["base"]
+
+    # Add daily variation (random walk)
+    if last_temp is not None:
+        # Continue from last temperature with small change
+        new_temp = last_temp + rng.uniform(-2, 2)
+    else:
+        # Initialize with base + random variation
+        new_temp = base_temp + rng.uniform(
+            -config.DAILY_VARIATION, config.DAILY_VARIATION
+        )
+
+    # Clamp to season min/max
+    new_temp = max(season_config["min"], min(season_config["max"], new_temp))
+
+    # Random extreme events
+    if rng.random() < config.EXTREME_EVENT_PROBABILITY:
+        if season in ["summer", "spring"] and rng.random() < 0.5:
+            new_temp += rng.uniform(5, 10)  # Heatwave
+        elif season in ["winter", "fall"] and rng.random() < 0.5:
+            new_temp -= rng.uniform(5, 10)  # Cold snap
+
+    return new_temp
+
+
+class _WeatherConnection(psycopg2.extensions.connection):
+    """Pooled connection that remembers whether weather_ins is prepared on it"""
+
+    weather_insert_prepared = False
 
 
 class WeatherSimulator:
+    # Shared across instances; created on first use so startup doesn't need Postgres
+    _pool: Optional[ThreadedConnectionPool] = None
+    _pool_lock = threading.Lock()
+
     def __init__(self):
         self.state = {}
         self.forced_scenarios = {}  # Manual scenario overrides
+        # Rows waiting to be written to external_factors (see flush_pending_writes)
+        self._pending = deque(maxlen=config.DB_MAX_PENDING_ROWS)
+        # Recent current-weather readings: location_id -> (expires_at_monotonic, payload)
+        self._weather_cache: Dict[int, tuple] = {}
+        self._weather_cache_lock = threading.Lock()
+        # Last reading queued per location: location_id -> ((temp, condition, humidity), written_at_monotonic)
+        self._last_written: Dict[int, tuple] = {}
         self.db_config = {
             "host": os.getenv("DB_HOST", "postgres"),
             "port": int(os.getenv("DB_PORT", 5432)),
@@ -27,152 +165,192 @@ class WeatherSimulator:
         }
 
     def get_db_connection(self):
-        """Get database connection"""
-        return psycopg2.connect(**self.db_config)
+        """Borrow a database connection from the pool"""
+        cls = type(self)
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = ThreadedConnectionPool(
+                        minconn=2,
+                        maxconn=16,
+                        connection_factory=_WeatherConnection,
+                        **self.db_config,
+                    )
+        return cls._pool.getconn()
+
+    def put_db_connection(self, conn, close: bool = False):
+        """Return a borrowed connection to the pool"""
+        type(self)._pool.putconn(conn, close=close)
+
+    def close_db_pool(self):
+        """Close all pooled connections"""
+        cls = type(self)
+        if cls._pool is not None:
+            cls._pool.closeall()
+            cls._pool = None
 
     def write_to_db(self, weather_data: Dict[str, Any]) -> bool:
-        """Write weather data to external_factors table"""
-        try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
+        """Queue weather data for the external_factors table"""
+        # Prepare factor_value JSON
+        factor_value = {
+            "temperature_celsius": weather_data["temperature_celsius"],
+            "temperature_fahrenheit": weather_data["temperature_fahrenheit"],
+            "condition": weather_data["condition"],
+            "humidity_percent": weather_data["humidity_percent"],
+            "season": weather_data["season"],
+            "is_extreme": weather_data["is_extreme"]
+        }
 
-            # Prepare factor_value JSON
-            factor_value = {
-                "temperature_celsius": weather_data["temperature_celsius"],
-                "temperature_fahrenheit": weather_data["temperature_fahrenheit"],
-                "condition": weather_data["condition"],
-                "humidity_percent": weather_data["humidity_percent"],
-                "season": weather_data["season"],
-                "is_extreme": weather_data["is_extreme"]
-            }
+        # Determine intensity based on temperature extremes
+        temp = weather_data["temperature_celsius"]
+        if temp >= 35:
+            intensity = 90
+        elif temp >= 30:
+            intensity = 75
+        elif temp <= 0:
+            intensity = 85
+        elif temp <= 5:
+            intensity = 70
+        else:
+            intensity = 50
 
-            # Determine intensity based on temperature extremes
-            temp = weather_data["temperature_celsius"]
+        # Determine factor name based on condition and temperature
+        if weather_data["is_extreme"]:
             if temp >= 35:
-                intensity = 90
-            elif temp >= 30:
-                intensity = 75
+                factor_name = "Extreme Heat"
             elif temp <= 0:
-                intensity = 85
-            elif temp <= 5:
-                intensity = 70
-            else:
-                intensity = 50
-
-            # Determine factor name based on condition and temperature
-            if weather_data["is_extreme"]:
-                if temp >= 35:
-                    factor_name = "Extreme Heat"
-                elif temp <= 0:
-                    factor_name = "Extreme Cold"
-                else:
-                    factor_name = f"{weather_data['condition'].title()} Weather"
+                factor_name = "Extreme Cold"
             else:
                 factor_name = f"{weather_data['condition'].title()} Weather"
+        else:
+            factor_name = f"{weather_data['condition'].title()} Weather"
+
+        now = datetime.now()
+        self._pending.append((
+            "weather",
+            factor_name,
+            weather_data.get("location_id"),
+            factor_value,  # Encoded at flush time, off the request path
+            intensity,
+            now,
+            now + _ONE_HOUR,
+        ))
+        return True
+
+    def has_pending_writes(self) -> bool:
+        """Whether any weather rows are waiting to be flushed"""
+        return bool(self._pending)
+
+    def flush_pending_writes(self) -> int:
+        """
+        Write all queued weather rows in one transaction.
+        Large backlogs are streamed with COPY; small batches run the prepared
+        weather_ins statement, where COPY's setup isn't worth it.
+        """
+        rows = []
+        while True:
+            try:
+                rows.append(self._pending.popleft())
+            except IndexError:
+                break
+
+        if not rows:
+            return 0
+
+        try:
+            conn = self.get_db_connection()
+        except Exception as e:
+            print(f"Error writing {len(rows)} weather rows to DB: {e}")
+            return 0
 
-            # Insert into external_factors table
-            query = """
-                INSERT INTO external_factors
-                (factor_type, factor_name, store_id, factor_value, intensity, start_date, end_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(query, (
-                "weather",
-                factor_name,
-                weather_data.get("location_id"),
-                json.dumps(factor_value),
-                intensity,
-                datetime.now(),
-                datetime.now() + timedelta(hours=1)  # Weather data valid for 1 hour
-            ))
+        healthy = False
+        try:
+            cursor = conn.cursor()
+
+            i = _FACTOR_VALUE_INDEX
+            if len(rows) >= config.DB_COPY_MIN_ROWS:
+                buffer = io.StringIO()
+                # csv writes None as an empty unquoted field, which COPY reads as NULL
+                csv.writer(buffer).writerows(
+                    row[:i] + (_json_dumps(row[i]),) + row[i + 1:] for row in rows
+                )
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY external_factors ({EXTERNAL_FACTORS_COLUMNS}) FROM STDIN WITH CSV",
+                    buffer,
+                )
+            else:
+                # PREPARE outlives rollbacks, so a connection only ever needs it once
+                if not conn.weather_insert_prepared:
+                    cursor.execute(PREPARE_WEATHER_INSERT_SQL)
+                    conn.weather_insert_prepared = True
+                execute_batch(
+                    cursor,
+                    "EXECUTE weather_ins (%s, %s, %s, %s, %s, %s, %s)",
+                    [row[:i] + (Json(row[i], dumps=_json_dumps),) + row[i + 1:] for row in rows],
+                    page_size=1000,
+                )
 
             conn.commit()
             cursor.close()
-            conn.close()
-            return True
+            healthy = True
+            return len(rows)
 
         except Exception as e:
-            print(f"Error writing weather data to DB: {e}")
-            return False
+            print(f"Error writing {len(rows)} weather rows to DB: {e}")
+            return 0
+
+        finally:
+            # A connection that failed mid-write is discarded rather than reused
+            self.put_db_connection(conn, close=not healthy)
 
     def get_current_season(self) -> str:
         """Determine current season based on date"""
-        month = datetime.now().month
-        if month in [12, 1, 2]:
-            return "winter"
-        elif month in [3, 4, 5]:
-            return "spring"
-        elif month in [6, 7, 8]:
-            return "summer"
-        else:
-            return "fall"
+        return _SEASON_BY_MONTH[datetime.now().month - 1]
 
     def generate_temperature(
         self, location_id: int, season: str, forced_scenario: Optional[str] = None
     ) -> float:
         """Generate temperature with seasonal patterns and random variation"""
+        forced_range = _FORCED_TEMPERATURE_RANGES.get(forced_scenario)
+        if forced_range:
+            return round(_rng().uniform(*forced_range), 1)
 
-        if forced_scenario == "heatwave":
-            return round(random.uniform(36, 42), 1)
-        elif forced_scenario == "cold_snap":
-            return round(random.uniform(-5, 5), 1)
-
-        # Get base temperature for season
-        season_config = config.SEASON_BASE_TEMPS[season]
-        base_temp = season_config["base"]
-
-        # Add daily variation (random walk)
         state_key = f"temp_{location_id}"
-        if state_key in self.state:
-            # Continue from last temperature with small change
-            last_temp = self.state[state_key]
-            variation = random.uniform(-2, 2)
-            new_temp = last_temp + variation
-        else:
-            # Initialize with base + random variation
-            new_temp = base_temp + random.uniform(
-                -config.DAILY_VARIATION, config.DAILY_VARIATION
-            )
-
-        # Clamp to season min/max
-        new_temp = max(season_config["min"], min(season_config["max"], new_temp))
-
-        # Random extreme events
-        if random.random() < config.EXTREME_EVENT_PROBABILITY:
-            if season in ["summer", "spring"] and random.random() < 0.5:
-                new_temp += random.uniform(5, 10)  # Heatwave
-            elif season in ["winter", "fall"] and random.random() < 0.5:
-                new_temp -= random.uniform(5, 10)  # Cold snap
-
+        new_temp = _walk_temperature(season, self.state.get(state_key))
         self.state[state_key] = new_temp
         return round(new_temp, 1)
 
-    def determine_condition(self, temperature: float) -> str:
-        """Determine weather condition based on temperature"""
-        weights = config.get_condition_weights(temperature)
-
-        # Random selection based on weights
-        conditions = list(weights.keys())
-        probabilities = list(weights.values())
-
-        return random.choices(conditions, weights=probabilities, k=1)[0]
-
-    def get_humidity(self, condition: str) -> int:
-        """Get humidity based on weather condition"""
-        humidity_range = config.HUMIDITY_RANGES.get(
-            condition, (40, 60)
-        )
-        return random.randint(*humidity_range)
-
     def get_current_weather(self, location_id: int) -> Dict[str, Any]:
-        """Get current weather for a location"""
+        """
+        Get current weather for a location. Repeated calls within
+        WEATHER_CACHE_TTL_SECONDS return the same reading (and write it once).
+        """
+        with self._weather_cache_lock:
+            now_mono = time.monotonic()
+            cached = self._weather_cache.get(location_id)
+            if cached and now_mono < cached[0]:
+                return cached[1]
+
+            weather_data = self._read_current_weather(location_id)
+
+            if len(self._weather_cache) >= config.WEATHER_CACHE_MAX_ENTRIES:
+                self._weather_cache = {
+                    key: entry for key, entry in self._weather_cache.items() if now_mono < entry[0]
+                }
+            self._weather_cache[location_id] = (
+                now_mono + config.WEATHER_CACHE_TTL_SECONDS,
+                weather_data,
+            )
+            return weather_data
+
+    def _read_current_weather(self, location_id: int) -> Dict[str, Any]:
+        """Advance a location's weather and queue the reading for the database"""
         season = self.get_current_season()
         forced_scenario = self.forced_scenarios.get(location_id)
 
         temperature = self.generate_temperature(location_id, season, forced_scenario)
-        condition = self.determine_condition(temperature)
-        humidity = self.get_humidity(condition)
+        condition, humidity = _sample_sky(temperature)
 
         weather_data = {
             "location_id": location_id,
@@ -186,8 +364,17 @@ class WeatherSimulator:
             or temperature <= config.COLD_SNAP_THRESHOLD,
         }
 
-        # Write to database
-        self.write_to_db(weather_data)
+        # Write to database, unless it would repeat the location's last row
+        reading = (temperature, condition, humidity)
+        now_mono = time.monotonic()
+        last = self._last_written.get(location_id)
+        if (
+            last is None
+            or last[0] != reading
+            or now_mono - last[1] >= config.UNCHANGED_WEATHER_REWRITE_SECONDS
+        ):
+            self.write_to_db(weather_data)
+            self._last_written[location_id] = (reading, now_mono)
 
         return weather_data
 
@@ -195,37 +382,47 @@ class WeatherSimulator:
         self, location_id: int, hours_ahead: int
     ) -> list[Dict[str, Any]]:
         """Get weather forecast for specified hours ahead"""
-        forecasts = []
         season = self.get_current_season()
-
-        for hour in range(1, hours_ahead + 1):
-            # Generate future weather with slight randomness
-            forced_scenario = self.forced_scenarios.get(location_id)
-            base_temp = self.generate_temperature(location_id, season, forced_scenario)
-
-            # Add some forecast uncertainty
-            temp_with_uncertainty = base_temp + random.uniform(-1, 1)
-            condition = self.determine_condition(temp_with_uncertainty)
-            humidity = self.get_humidity(condition)
-
-            forecast_time = datetime.now() + timedelta(hours=hour)
-
-            forecasts.append(
-                {
-                    "location_id": location_id,
-                    "forecast_hour": hour,
-                    "forecast_time": forecast_time.isoformat(),
-                    "temperature_celsius": round(temp_with_uncertainty, 1),
-                    "temperature_fahrenheit": round(
-                        temp_with_uncertainty * 9 / 5 + 32, 1
-                    ),
-                    "condition": condition,
-                    "humidity_percent": humidity,
-                    "confidence": round(max(0.6, 1.0 - (hour * 0.02)), 2),
-                }
+        forced_scenario = self.forced_scenarios.get(location_id)
+        hours = range(1, hours_ahead + 1)
+        uniform = _rng().uniform
+
+        # Build each column for the whole horizon in one pass, then zip into rows.
+        # The walk runs on a local copy so a forecast never moves the current baseline.
+        forced_range = _FORCED_TEMPERATURE_RANGES.get(forced_scenario)
+        if forced_range:
+            base_temps = [round(uniform(*forced_range), 1) for _ in hours]
+        else:
+            last_temp = self.state.get(f"temp_{location_id}")
+            base_temps = []
+            for _ in hours:
+                last_temp = _walk_temperature(season, last_temp)
+                base_temps.append(round(last_temp, 1))
+        # Add some forecast uncertainty
+        temps = [base_temp + uniform(-1, 1) for base_temp in base_temps]
+        skies = [_sample_sky(temp) for temp in temps]
+        temps_c = [round(temp, 1) for temp in temps]
+        temps_f = [round(temp * 1.8 + 32, 1) for temp in temps]
+        start = datetime.now()
+        forecast_times = [(start + timedelta(hours=hour)).isoformat() for hour in hours]
+        # Confidence only depends on how far out the hour is
+        confidences = [round(max(0.6, 1.0 - hour * 0.02), 2) for hour in hours]
+
+        return [
+            {
+                "location_id": location_id,
+                "forecast_hour": hour,
+                "forecast_time": forecast_time,
+                "temperature_celsius": temp_c,
+                "temperature_fahrenheit": temp_f,
+                "condition": condition,
+                "humidity_percent": humidity,
+                "confidence": confidence,
+            }
+            for hour, forecast_time, temp_c, temp_f, (condition, humidity), confidence in zip(
+                hours, forecast_times, temps_c, temps_f, skies, confidences
             )
-
-        return forecasts
+        ]
 
     def set_weather_scenario(
         self, location_id: int, scenario: str, duration_hours: int = 24
@@ -249,6 +446,10 @@ class WeatherSimulator:
         else:
             self.forced_scenarios[location_id] = scenario
 
+        # The next reading should reflect the new scenario straight away
+        with self._weather_cache_lock:
+            self._weather_cache.pop(location_id, None)
+
         return {
             "location_id": location_id,
             "scenario": scenario,
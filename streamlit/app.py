@@ -3,10 +3,10 @@ Pricing Intelligence Agent - Streamlit Dashboard
 Main application entry point
 """
 
-import httpx
+import pyarrow as pa
 from psycopg2.extras import RealDictCursor
 import streamlit as st
-from common import get_db_connection, render_sidebar
+from common import check_mcp_servers, db_ok, get_db_connection, render_sidebar
 
 # Page configuration
 st.set_page_config(
@@ -17,145 +17,142 @@ st.set_page_config(
 )
 
 
-def main():
-    """Main dashboard page"""
-    agent_status, status_error = render_sidebar(show_navigation=False, key_prefix="dashboard")
-
-    st.title("🤖 Pricing Intelligence & Promotion Agent")
-    st.markdown("---")
-
-    # Main dashboard content
-    col1, col2, col3, col4, col5 = st.columns(5)
-
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Get metrics
-        cursor.execute("SELECT COUNT(*) as count FROM skus WHERE is_active = true")
-        sku_count = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM promotions WHERE status = 'active'")
-        active_promos = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM pending_promotions WHERE status = 'pending'")
-        pending_promos = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT SUM(actual_revenue) as revenue FROM promotions WHERE status IN ('active', 'completed')")
-        total_revenue = cursor.fetchone()["revenue"] or 0
-
-        cursor.execute("SELECT SUM(estimated_cost) as cost FROM token_usage WHERE timestamp >= NOW() - INTERVAL '24 hours'")
-        daily_cost = cursor.fetchone()["cost"] or 0
-
-        # Display metrics
-        with col1:
-            st.metric("Active SKUs", sku_count)
+DASHBOARD_CACHE_TTL_SECONDS = 30
+
+
+RECENT_PROMOTIONS_SQL = """
+SELECT
+    p.promotion_code,
+    s.name as sku_name,
+    st.name as store_name,
+    p.promotional_price,
+    p.discount_value,
+    p.status,
+    p.created_at,
+    p.actual_units_sold,
+    p.expected_units_sold,
+    ROUND(p.actual_units_sold * 100.0 / NULLIF(p.expected_units_sold, 0), 1)::float8 as performance
+FROM promotions p
+JOIN skus s ON p.sku_id = s.id
+JOIN stores st ON p.store_id = st.id
+ORDER BY p.created_at DESC
+LIMIT 10
+"""
 
-        with col2:
-            st.metric("Active Promotions", active_promos)
+# Headline counters plus both quick-stats panels in a single row. The panels come back
+# as display-ready JSON arrays (json, not jsonb, so the column order is kept).
+DASHBOARD_SUMMARY_SQL = """
+WITH top_skus AS (
+    SELECT
+        s.name,
+        COUNT(p.id) as promo_count,
+        SUM(p.actual_revenue) as revenue
+    FROM skus s
+    LEFT JOIN promotions p ON s.id = p.sku_id AND p.status = 'completed'
+    GROUP BY s.id, s.name
+    ORDER BY revenue DESC NULLS LAST
+    LIMIT 5
+),
+agent_costs AS (
+    SELECT
+        agent_name,
+        SUM(estimated_cost) as cost,
+        COUNT(*) as operations
+    FROM token_usage
+    WHERE timestamp >= NOW() - INTERVAL '7 days'
+    GROUP BY agent_name
+    ORDER BY cost DESC
+    LIMIT 5
+)
+SELECT
+    (SELECT COUNT(*) FROM skus WHERE is_active = true) as sku_count,
+    (SELECT COUNT(*) FROM promotions WHERE status = 'active') as active_promos,
+    (SELECT COUNT(*) FROM pending_promotions WHERE status = 'pending') as pending_promos,
+    (SELECT SUM(actual_revenue) FROM promotions WHERE status IN ('active', 'completed')) as total_revenue,
+    (SELECT SUM(estimated_cost) FROM token_usage WHERE timestamp >= NOW() - INTERVAL '24 hours') as daily_cost,
+    (
+        SELECT COALESCE(json_agg(json_build_object(
+            'SKU', t.name,
+            'Promotions', t.promo_count,
+            'Revenue', TO_CHAR(COALESCE(t.revenue, 0), 'FM$999,999,990.00')
+        ) ORDER BY t.revenue DESC NULLS LAST), '[]'::json)
+        FROM top_skus t
+    ) as top_skus,
+    (
+        SELECT COALESCE(json_agg(json_build_object(
+            'Agent', a.agent_name,
+            'Cost', TO_CHAR(a.cost, 'FM$999,990.0000'),
+            'Operations', a.operations
+        ) ORDER BY a.cost DESC), '[]'::json)
+        FROM agent_costs a
+    ) as agent_costs
+"""
 
-        with col3:
-            st.metric("Pending Approval", pending_promos, delta=None if pending_promos == 0 else "Action Required")
 
-        with col4:
-            st.metric("Total Revenue", f"${total_revenue:,.2f}")
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_dashboard_data() -> dict:
+    """Summary row and recent promotions, in two round-trips over one connection."""
+    with get_db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(DASHBOARD_SUMMARY_SQL)
+        summary = dict(cursor.fetchone())
+        cursor.execute(RECENT_PROMOTIONS_SQL)
+        recent_promos = [dict(row) for row in cursor.fetchall()]
+    return {"summary": summary, "recent_promos": recent_promos}
 
-        with col5:
-            st.metric("24h Agent Cost", f"${daily_cost:.4f}")
 
-        st.markdown("---")
+def render_metrics(summary: dict):
+    """Headline counters row."""
+    pending_promos = summary["pending_promos"]
+    total_revenue = summary["total_revenue"] or 0
+    daily_cost = summary["daily_cost"] or 0
 
-        # Recent promotions
-        st.subheader("Recent Promotions")
-        cursor.execute(
-            """
-            SELECT
-                p.promotion_code,
-                s.name as sku_name,
-                st.name as store_name,
-                p.promotional_price,
-                p.discount_value,
-                p.status,
-                p.created_at,
-                p.actual_units_sold,
-                p.expected_units_sold
-            FROM promotions p
-            JOIN skus s ON p.sku_id = s.id
-            JOIN stores st ON p.store_id = st.id
-            ORDER BY p.created_at DESC
-            LIMIT 10
-            """
-        )
-        recent_promos = cursor.fetchall()
-
-        if recent_promos:
-            import pandas as pd
-
-            df = pd.DataFrame(recent_promos)
-            df["performance"] = (df["actual_units_sold"] / df["expected_units_sold"] * 100).round(1)
-            st.dataframe(df, use_container_width=True)
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Active SKUs", summary["sku_count"])
+    with col2:
+        st.metric("Active Promotions", summary["active_promos"])
+    with col3:
+        st.metric("Pending Approval", pending_promos, delta=None if pending_promos == 0 else "Action Required")
+    with col4:
+        st.metric("Total Revenue", f"${total_revenue:,.2f}")
+    with col5:
+        st.metric("24h Agent Cost", f"${daily_cost:.4f}")
+
+
+def render_recent_promos(recent_promos: list):
+    """Latest promotions table."""
+    st.subheader("Recent Promotions")
+    if recent_promos:
+        # Rows go straight to Arrow, which is what st.dataframe serializes anyway
+        st.dataframe(pa.Table.from_pylist(recent_promos), use_container_width=True)
+    else:
+        st.info("No promotions yet. Agent is analyzing market conditions...")
+
+
+def render_top_and_costs(summary: dict):
+    """Quick stats: top SKUs by revenue and 7-day cost by agent."""
+    top_skus = summary["top_skus"]
+    agent_costs = summary["agent_costs"]
+
+    stats_col1, stats_col2 = st.columns(2)
+
+    with stats_col1:
+        st.subheader("Top Performing SKUs")
+        if top_skus:
+            st.dataframe(top_skus, use_container_width=True, hide_index=True)
         else:
-            st.info("No promotions yet. Agent is analyzing market conditions...")
-
-        st.markdown("---")
+            st.info("No data available yet")
 
-        # Quick stats
-        stats_col1, stats_col2 = st.columns(2)
-
-        with stats_col1:
-            st.subheader("Top Performing SKUs")
-            cursor.execute(
-                """
-                SELECT
-                    s.name,
-                    COUNT(p.id) as promo_count,
-                    SUM(p.actual_revenue) as revenue
-                FROM skus s
-                LEFT JOIN promotions p ON s.id = p.sku_id AND p.status = 'completed'
-                GROUP BY s.id, s.name
-                ORDER BY revenue DESC NULLS LAST
-                LIMIT 5
-                """
-            )
-            top_skus = cursor.fetchall()
-
-            if top_skus:
-                for sku in top_skus:
-                    st.write(f"**{sku['name']}**: {sku['promo_count']} promos, ${sku['revenue'] or 0:.2f}")
-            else:
-                st.info("No data available yet")
-
-        with stats_col2:
-            st.subheader("Cost by Agent")
-            cursor.execute(
-                """
-                SELECT
-                    agent_name,
-                    SUM(estimated_cost) as cost,
-                    COUNT(*) as operations
-                FROM token_usage
-                WHERE timestamp >= NOW() - INTERVAL '7 days'
-                GROUP BY agent_name
-                ORDER BY cost DESC
-                LIMIT 5
-                """
-            )
-            agent_costs = cursor.fetchall()
-
-            if agent_costs:
-                for agent in agent_costs:
-                    st.write(f"**{agent['agent_name']}**: ${agent['cost']:.4f} ({agent['operations']} ops)")
-            else:
-                st.info("No cost data available yet")
-
-        cursor.close()
-        conn.close()
+    with stats_col2:
+        st.subheader("Cost by Agent")
+        if agent_costs:
+            st.dataframe(agent_costs, use_container_width=True, hide_index=True)
+        else:
+            st.info("No cost data available yet")
 
-    except Exception as e:
-        st.error(f"Error connecting to database: {e}")
 
-    # System status
-    st.markdown("---")
+def render_system_status(agent_status: dict, status_error: str):
+    """Agent, MCP and database health row."""
     st.subheader("System Status")
 
     status_col1, status_col2, status_col3 = st.columns(3)
@@ -164,38 +161,55 @@ def main():
         st.write("**LangGraph Agent**")
         if status_error:
             st.warning("Unavailable")
+        elif agent_status.get("running"):
+            st.success("Running")
         else:
-            if agent_status.get("running"):
-                st.success("Running")
-            else:
-                st.info("Paused")
+            st.info("Paused")
 
     with status_col2:
         st.write("**MCP Servers**")
-        all_healthy = True
-        for server in ["postgres", "weather", "competitor", "social"]:
-            try:
-                port = {"postgres": 3000, "weather": 3001, "competitor": 3002, "social": 3003}[server]
-                response = httpx.get(f"http://mcp-{server}:{port}/health", timeout=5.0)
-                if response.status_code != 200:
-                    all_healthy = False
-            except Exception:
-                all_healthy = False
-
-        if all_healthy:
+        if all(check_mcp_servers().values()):
             st.success("All Healthy")
         else:
             st.warning("Some Unavailable")
 
     with status_col3:
         st.write("**Database**")
-        try:
-            conn = get_db_connection()
-            conn.close()
+        if db_ok():
             st.success("Connected")
-        except Exception:
+        else:
             st.error("Disconnected")
 
 
+def main():
+    """Main dashboard page"""
+    agent_status, status_error = render_sidebar(show_navigation=False, key_prefix="dashboard")
+
+    title_col, refresh_col = st.columns([5, 1])
+    with title_col:
+        st.title("🤖 Pricing Intelligence & Promotion Agent")
+    with refresh_col:
+        if st.button(
+            "↻ Refresh metrics",
+            key="dashboard_refresh_metrics",
+            help=f"Dashboard figures are cached for {DASHBOARD_CACHE_TTL_SECONDS}s",
+        ):
+            load_dashboard_data.clear()
+    st.markdown("---")
+
+    try:
+        dashboard = load_dashboard_data()
+        render_metrics(dashboard["summary"])
+        st.markdown("---")
+        render_recent_promos(dashboard["recent_promos"])
+        st.markdown("---")
+        render_top_and_costs(dashboard["summary"])
+    except Exception as e:
+        st.error(f"Error connecting to database: {e}")
+
+    st.markdown("---")
+    render_system_status(agent_status, status_error)
+
+
 if __name__ == "__main__":
     main()
@@ -1,14 +1,25 @@
 """
 Shared Streamlit utilities:
-- database connection
+- pooled database connections
+- MCP server health probes
+- shared keep-alive HTTP client
 - agent control/status sidebar
 """
 
+import atexit
+import json
 import os
-from typing import Optional, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
 
 import httpx
+import pandas as pd
 import psycopg2
+import pyarrow as pa
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
 import streamlit as st
 
 DB_CONFIG = {
@@ -20,43 +31,266 @@ DB_CONFIG = {
 }
 
 LANGGRAPH_API_URL = os.getenv("LANGGRAPH_API_URL", "http://langgraph-core:8000")
+MCP_SERVERS = ("postgres", "weather", "competitor", "social")
+# Agent status poll choices shown in the sidebar; None means refresh on demand only
+AGENT_STATUS_POLL_OPTIONS = {"5s": 5, "10s": 10, "30s": 30, "Off": None}
+AGENT_STATUS_POLL_DEFAULT = "10s"
+# langgraph-core sends a keepalive comment every 15s, so a silent stream past this is dead
+AGENT_STATUS_STREAM_READ_TIMEOUT = 30.0
+AGENT_STATUS_STREAM_RETRY_SECONDS = 2.0
 
 
-def get_db_connection():
-    """Get database connection."""
-    return psycopg2.connect(**DB_CONFIG)
+DB_POOL_MIN_CONN = 2
+DB_POOL_MAX_CONN = 20
+# TCP keepalives so pooled connections that sit idle between reruns are kept open
+# (and dead ones are noticed) instead of being silently dropped along the way
+DB_KEEPALIVE_OPTIONS = {"keepalives": 1, "keepalives_idle": 30, "keepalives_interval": 10, "keepalives_count": 3}
+# Rows per fetchmany() round when streaming results into Arrow
+FETCH_BATCH_ROWS = 2000
 
 
-def get_agent_status() -> Tuple[Optional[dict], Optional[str]]:
-    """Get agent runtime status from langgraph-core."""
+class _PooledConnection(psycopg2.extensions.connection):
+    """Pooled connection that remembers which statements are prepared on its session."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_pool() -> ThreadedConnectionPool:
+    """Process-wide connection pool, shared by every session and rerun."""
+    pool = ThreadedConnectionPool(
+        DB_POOL_MIN_CONN,
+        DB_POOL_MAX_CONN,
+        connection_factory=_PooledConnection,
+        **DB_CONFIG,
+        **DB_KEEPALIVE_OPTIONS,
+    )
+    atexit.register(pool.closeall)
+    return pool
+
+
+@contextmanager
+def get_db_connection() -> Iterator["psycopg2.extensions.connection"]:
+    """Borrow a pooled database connection for the duration of a with-block."""
+    pool = _get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        # End the read transaction so the connection goes back idle; drop it if it broke
+        try:
+            if not conn.closed:
+                conn.rollback()
+        except psycopg2.Error:
+            pass
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def fetch_df(cursor, sql: str, params=None, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Run a query on a plain (tuple) cursor and build the DataFrame column-wise
+    from the records. Column names come from the query unless `columns` relabels them.
+    """
+    cursor.execute(sql, params)
+    if columns is None:
+        columns = [description[0] for description in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def _stable_arrow_type(arrow_type: pa.DataType) -> pa.DataType:
+    """
+    Type to pin a fetched column to. Decimal precision is inferred from the values
+    (0.000123 -> decimal128(6, 6)), so widen it to the maximum to fit later batches.
+    """
+    if pa.types.is_decimal(arrow_type):
+        return pa.decimal128(38, arrow_type.scale)
+    return arrow_type
+
+
+def fetch_arrow(
+    cursor, sql: str, params=None, columns: Optional[list] = None, batch_size: int = FETCH_BATCH_ROWS
+) -> pa.Table:
+    """
+    Like fetch_df, but transposes rows straight into Arrow columns. For results
+    that only feed st.dataframe, which serializes to Arrow anyway, this skips pandas.
+    Rows are pulled `batch_size` at a time, so with a named (server-side) cursor
+    only one batch of Python tuples is alive at once however large the result.
+    """
+    cursor.execute(sql, params)
+    chunks = []
+    # Column types are fixed by the first batch with a non-null value, so every batch
+    # agrees; until then a column stays null-typed and is promoted on concat
+    types = None
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if columns is None:
+            columns = [description[0] for description in cursor.description]
+        if types is None:
+            types = [pa.null()] * len(columns)
+        arrays = []
+        for i, values in enumerate(zip(*rows)):
+            if pa.types.is_null(types[i]):
+                array = pa.array(values)
+                types[i] = _stable_arrow_type(array.type)
+                array = array.cast(types[i])
+            else:
+                array = pa.array(values, type=types[i])
+            arrays.append(array)
+        chunks.append(pa.table(arrays, names=columns))
+    if not chunks:
+        if columns is None:
+            columns = [description[0] for description in cursor.description or ()]
+        return pa.table({name: pa.array([]) for name in columns})
+    # Only null-typed leading chunks need promoting; all other types already match
+    return pa.concat_tables(chunks, promote_options="default")
+
+
+def prepare_once(conn, name: str, prepare_sql: str):
+    """Run a PREPARE statement unless this pooled connection already has `name` prepared."""
+    if name not in conn.prepared_statements:
+        with conn.cursor() as cursor:
+            cursor.execute(prepare_sql)
+        conn.prepared_statements.add(name)
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def db_ok() -> bool:
+    """Ping a pooled connection with SELECT 1, re-checked at most every 15 seconds."""
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        return True
+    except Exception:
+        return False
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_client() -> httpx.Client:
+    """Process-wide keep-alive client for langgraph-core and MCP server calls."""
+    client = httpx.Client(
+        timeout=5.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+    atexit.register(client.close)
+    return client
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def check_mcp_servers() -> dict:
+    """Health of each MCP server via langgraph-core, re-probed at most every 10 seconds."""
     try:
-        response = httpx.get(f"{LANGGRAPH_API_URL}/status", timeout=5.0)
+        response = get_http_client().get(f"{LANGGRAPH_API_URL}/status/all")
+        response.raise_for_status()
+        return response.json()
+    except Exception:
+        return {server: False for server in MCP_SERVERS}
+
+
+class _AgentStatusStream:
+    """
+    Follows langgraph-core's /status/stream from a daemon thread and keeps the
+    latest payload in memory, reconnecting whenever the stream drops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status: Optional[dict] = None
+        self._connected = False
+
+    def snapshot(self) -> Optional[dict]:
+        """Latest pushed status, or None while the stream is down."""
+        with self._lock:
+            return self._status if self._connected else None
+
+    def publish(self, status: Optional[dict], connected: bool = True):
+        with self._lock:
+            self._status = status
+            self._connected = connected
+
+    def run(self):
+        timeout = httpx.Timeout(5.0, read=AGENT_STATUS_STREAM_READ_TIMEOUT)
+        while True:
+            try:
+                with httpx.stream("GET", f"{LANGGRAPH_API_URL}/status/stream", timeout=timeout) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if line.startswith("data:"):
+                            self.publish(json.loads(line[5:]))
+            except Exception:
+                pass
+            self.publish(None, connected=False)
+            time.sleep(AGENT_STATUS_STREAM_RETRY_SECONDS)
+
+
+@st.cache_resource(show_spinner=False)
+def _agent_status_stream() -> _AgentStatusStream:
+    """One status subscription per Streamlit process, shared by every session."""
+    stream = _AgentStatusStream()
+    threading.Thread(target=stream.run, name="agent-status-stream", daemon=True).start()
+    return stream
+
+
+@st.cache_data(ttl=2, show_spinner=False)
+def _fetch_agent_status() -> Tuple[Optional[dict], Optional[str]]:
+    """Request/response fallback for when the status stream is down, shared for 2 seconds."""
+    try:
+        response = get_http_client().get(f"{LANGGRAPH_API_URL}/status")
         response.raise_for_status()
         return response.json(), None
     except Exception as e:
         return None, str(e)
 
 
+def get_agent_status() -> Tuple[Optional[dict], Optional[str]]:
+    """Get agent runtime status: the streamed snapshot when connected, else a direct fetch."""
+    status = _agent_status_stream().snapshot()
+    if status is not None:
+        return status, None
+    return _fetch_agent_status()
+
+
 def set_agent_running(should_run: bool) -> Tuple[bool, str]:
     """Start or stop the autonomous agent loop."""
     endpoint = "start" if should_run else "stop"
     try:
-        response = httpx.post(f"{LANGGRAPH_API_URL}/agent/{endpoint}", timeout=10.0)
+        response = get_http_client().post(f"{LANGGRAPH_API_URL}/agent/{endpoint}", timeout=10.0)
         response.raise_for_status()
         payload = response.json()
+        if payload.get("status"):
+            # Show the new state right away rather than waiting for the stream to echo it
+            stream = _agent_status_stream()
+            if stream.snapshot() is not None:
+                stream.publish(payload["status"])
         return payload.get("success", False), payload.get("message", "No message returned")
     except Exception as e:
         return False, str(e)
 
 
+def _on_agent_toggle(should_run: bool, key_prefix: str):
+    """Button callback: runs before the fragment re-renders, so the new state is fetched fresh."""
+    success, message = set_agent_running(should_run)
+    _fetch_agent_status.clear()
+    st.session_state[f"{key_prefix}_agent_result"] = (success, should_run, message)
+
+
 def render_agent_control(agent_status: Optional[dict], status_error: Optional[str], key_prefix: str = "global"):
     """Render start/stop controls in sidebar."""
     header_col, refresh_col = st.columns([5, 1])
     with header_col:
         st.subheader("Agent Control")
     with refresh_col:
-        if st.button("↻", key=f"{key_prefix}_agent_refresh", help="Refresh current agent state"):
-            st.rerun()
+        # Clicking drops the memoized fallback status and reruns the enclosing fragment
+        st.button(
+            "↻",
+            key=f"{key_prefix}_agent_refresh",
+            help="Refresh current agent state",
+            on_click=_fetch_agent_status.clear,
+        )
 
     if status_error:
         st.warning("Agent control unavailable")
@@ -99,27 +333,56 @@ def render_agent_control(agent_status: Optional[dict], status_error: Optional[st
         st.caption("Next Target: None (end of cycle / monitoring)")
 
     if running:
-        if st.button("Stop Agents", key=f"{key_prefix}_agent_stop", use_container_width=True):
-            success, message = set_agent_running(False)
-            if success:
-                st.warning(message)
-            else:
-                st.error(message)
-            st.rerun()
+        st.button(
+            "Stop Agents",
+            key=f"{key_prefix}_agent_stop",
+            use_container_width=True,
+            on_click=_on_agent_toggle,
+            args=(False, key_prefix),
+        )
     else:
-        if st.button("Start Agents", key=f"{key_prefix}_agent_start", type="primary", use_container_width=True):
-            success, message = set_agent_running(True)
-            if success:
-                st.success(message)
-            else:
-                st.error(message)
-            st.rerun()
+        st.button(
+            "Start Agents",
+            key=f"{key_prefix}_agent_start",
+            type="primary",
+            use_container_width=True,
+            on_click=_on_agent_toggle,
+            args=(True, key_prefix),
+        )
 
+    result = st.session_state.pop(f"{key_prefix}_agent_result", None)
+    if result:
+        success, should_run, message = result
+        if not success:
+            st.error(message)
+        elif should_run:
+            st.success(message)
+        else:
+            st.warning(message)
 
-def render_sidebar(show_navigation: bool = False, key_prefix: str = "global"):
-    """Render shared sidebar content. Agent Control is always present."""
+
+def _agent_control_body(key_prefix: str):
+    """
+    Agent Control body, run as a fragment: the periodic poll and its buttons rerun
+    only this block, not the page's queries. The latest status is left in session
+    state for render_sidebar to return.
+    """
     agent_status, status_error = get_agent_status()
+    st.session_state[f"{key_prefix}_agent_status"] = (agent_status, status_error)
+    render_agent_control(agent_status, status_error, key_prefix=key_prefix)
+
 
+# run_every is fixed when a fragment is declared, so there is one per poll choice.
+# Browsers throttle timers in background tabs, which also slows polling while hidden.
+# While the status stream is connected a poll only redraws the pushed snapshot.
+_AGENT_CONTROL_FRAGMENTS = {
+    label: st.fragment(run_every=seconds)(_agent_control_body)
+    for label, seconds in AGENT_STATUS_POLL_OPTIONS.items()
+}
+
+
+def render_sidebar(show_navigation: bool = False, key_prefix: str = "global"):
+    """Render shared sidebar content. Agent Control is always present."""
     with st.sidebar:
         if show_navigation:
             st.header("Navigation")
@@ -137,6 +400,14 @@ def render_sidebar(show_navigation: bool = False, key_prefix: str = "global"):
                 """
             )
 
-        render_agent_control(agent_status, status_error, key_prefix=key_prefix)
+        poll_label = st.radio(
+            "Status refresh",
+            options=list(AGENT_STATUS_POLL_OPTIONS),
+            index=list(AGENT_STATUS_POLL_OPTIONS).index(AGENT_STATUS_POLL_DEFAULT),
+            key="agent_status_poll_interval",
+            horizontal=True,
+            help="How often Agent Control re-fetches /status; ↻ refreshes on demand",
+        )
+        _AGENT_CONTROL_FRAGMENTS[poll_label](key_prefix)
 
-    return agent_status, status_error
+    return st.session_state[f"{key_prefix}_agent_status"]
@@ -1,8 +1,16 @@
 import streamlit as st
-import sys
-sys.path.append('..')
-from common import get_db_connection, render_sidebar
-import pandas as pd
+from common import fetch_arrow, get_db_connection, render_sidebar
+
+SKU_CATALOG_CACHE_TTL_SECONDS = 300
+
+
+@st.cache_data(ttl=SKU_CATALOG_CACHE_TTL_SECONDS, show_spinner=False)
+def load_active_skus() -> list:
+    """Active SKU catalog for the dropdown; changes rarely, so reruns reuse it."""
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT id, sku_code, name FROM skus WHERE is_active = true ORDER BY name")
+        return cursor.fetchall()
+
 
 render_sidebar(show_navigation=False, key_prefix="sku_monitor")
 
@@ -10,68 +18,58 @@ st.title("📦 SKU Monitor")
 st.markdown("---")
 
 try:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Get all SKUs
-    cursor.execute("SELECT id, sku_code, name, category FROM skus WHERE is_active = true ORDER BY name")
-    skus = cursor.fetchall()
-
-    sku_options = {f"{sku[1]} - {sku[2]}": sku[0] for sku in skus}
-    selected_sku = st.selectbox("Select SKU", options=list(sku_options.keys()))
-
-    if selected_sku:
-        sku_id = sku_options[selected_sku]
-
-        # Get inventory status
-        st.subheader("Inventory Status")
-        cursor.execute("""
-            SELECT
-                st.name as store,
-                i.quantity,
-                i.reorder_point,
-                i.max_capacity,
-                CASE
-                    WHEN i.quantity <= i.reorder_point THEN 'Low'
-                    WHEN i.quantity >= i.max_capacity * 0.8 THEN 'Excess'
-                    ELSE 'Normal'
-                END as status
-            FROM inventory i
-            JOIN stores st ON i.store_id = st.id
-            WHERE i.sku_id = %s
-        """, (sku_id,))
-        inventory = cursor.fetchall()
-
-        if inventory:
-            df = pd.DataFrame(inventory, columns=["Store", "Quantity", "Reorder Point", "Max Capacity", "Status"])
-            st.dataframe(df, use_container_width=True)
-
-        # Get recent promotions
-        st.subheader("Recent Promotions")
-        cursor.execute("""
-            SELECT
-                promotion_code,
-                status,
-                promotional_price,
-                actual_units_sold,
-                expected_units_sold,
-                actual_revenue,
-                created_at
-            FROM promotions
-            WHERE sku_id = %s
-            ORDER BY created_at DESC
-            LIMIT 10
-        """, (sku_id,))
-        promos = cursor.fetchall()
-
-        if promos:
-            df = pd.DataFrame(promos, columns=["Code", "Status", "Price", "Units Sold", "Expected Units", "Revenue", "Created"])
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No promotions for this SKU yet")
-
-    cursor.close()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        # Get all SKUs
+        skus = load_active_skus()
+
+        sku_options = {f"{sku[1]} - {sku[2]}": sku[0] for sku in skus}
+        selected_sku = st.selectbox("Select SKU", options=list(sku_options.keys()))
+
+        if selected_sku:
+            sku_id = sku_options[selected_sku]
+
+            # Get inventory status
+            st.subheader("Inventory Status")
+            table = fetch_arrow(cursor, """
+                SELECT
+                    st.name as store,
+                    i.quantity,
+                    i.reorder_point,
+                    i.max_capacity,
+                    INITCAP(i.stock_status) as status
+                FROM inventory i
+                JOIN stores st ON i.store_id = st.id
+                WHERE i.sku_id = %s
+            """, (sku_id,), columns=["Store", "Quantity", "Reorder Point", "Max Capacity", "Status"])
+
+            if table.num_rows:
+                st.dataframe(table, use_container_width=True)
+
+            # Get recent promotions
+            st.subheader("Recent Promotions")
+            table = fetch_arrow(cursor, """
+                SELECT
+                    promotion_code,
+                    status,
+                    promotional_price,
+                    actual_units_sold,
+                    expected_units_sold,
+                    actual_revenue,
+                    created_at
+                FROM promotions
+                WHERE sku_id = %s
+                ORDER BY created_at DESC
+                LIMIT 10
+            """, (sku_id,), columns=["Code", "Status", "Price", "Units Sold", "Expected Units", "Revenue", "Created"])
+
+            if table.num_rows:
+                st.dataframe(table, use_container_width=True)
+            else:
+                st.info("No promotions for this SKU yet")
+
+        cursor.close()
 
 except Exception as e:
     st.error(f"Error: {e}")
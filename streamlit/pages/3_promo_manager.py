@@ -1,7 +1,5 @@
 import streamlit as st
-import sys
-sys.path.append('..')
-from common import get_db_connection, render_sidebar
+from common import fetch_df, get_db_connection, prepare_once, render_sidebar
 import pandas as pd
 
 render_sidebar(show_navigation=False, key_prefix="promo_manager")
@@ -9,92 +7,92 @@ render_sidebar(show_navigation=False, key_prefix="promo_manager")
 st.title("🎯 Promotion Manager")
 st.markdown("---")
 
+# One statement per sort key, so each plan's ORDER BY is fixed and can use an index;
+# only the status filter and the limit are parameters
+PROMO_BY_STATUS_SQL = """
+    PREPARE {name} (text, int) AS
+    SELECT
+        p.id,
+        p.promotion_code,
+        s.name as sku,
+        st.name as store,
+        p.promotional_price,
+        p.valid_from,
+        p.valid_until,
+        p.actual_units_sold,
+        p.expected_units_sold,
+        p.actual_revenue,
+        p.margin_percent,
+        p.created_at,
+        p.retraction_reason,
+        p.retracted_at,
+        ROUND(p.actual_units_sold * 100.0 / NULLIF(p.expected_units_sold, 0), 1)::float8 as performance
+    FROM promotions p
+    JOIN skus s ON p.sku_id = s.id
+    JOIN stores st ON p.store_id = st.id
+    WHERE p.status = $1
+    ORDER BY {order_by} DESC
+    LIMIT $2
+"""
+PROMO_STATEMENTS = {
+    "promo_by_created": "p.created_at",
+    "promo_by_retracted": "p.retracted_at",
+}
+PROMO_COLUMNS = [
+    "ID", "Code", "SKU", "Store", "Price", "From", "Until", "Sold", "Expected",
+    "Revenue", "Margin %", "Created", "Reason", "Retracted At", "Performance %",
+]
+
+
+def promotions_by_status(cursor, status: str, limit=None, statement="promo_by_created") -> pd.DataFrame:
+    """Promotions in one status via a prepared statement (no limit when None)."""
+    return fetch_df(cursor, f"EXECUTE {statement} (%s, %s)", (status, limit), columns=PROMO_COLUMNS)
+
+
 try:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    tab1, tab2, tab3 = st.tabs(["Active Promotions", "Completed Promotions", "Retracted Promotions"])
-
-    with tab1:
-        st.subheader("Active Promotions")
-        cursor.execute("""
-            SELECT
-                p.id,
-                p.promotion_code,
-                s.name as sku,
-                st.name as store,
-                p.promotional_price,
-                p.valid_from,
-                p.valid_until,
-                p.actual_units_sold,
-                p.expected_units_sold,
-                p.actual_revenue
-            FROM promotions p
-            JOIN skus s ON p.sku_id = s.id
-            JOIN stores st ON p.store_id = st.id
-            WHERE p.status = 'active'
-            ORDER BY p.valid_until
-        """)
-        active = cursor.fetchall()
-
-        if active:
-            df = pd.DataFrame(active, columns=["ID", "Code", "SKU", "Store", "Price", "From", "Until", "Sold", "Expected", "Revenue"])
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No active promotions")
-
-    with tab2:
-        st.subheader("Completed Promotions")
-        cursor.execute("""
-            SELECT
-                p.promotion_code,
-                s.name as sku,
-                p.actual_units_sold,
-                p.expected_units_sold,
-                p.actual_revenue,
-                p.margin_percent,
-                p.created_at
-            FROM promotions p
-            JOIN skus s ON p.sku_id = s.id
-            WHERE p.status = 'completed'
-            ORDER BY p.created_at DESC
-            LIMIT 20
-        """)
-        completed = cursor.fetchall()
-
-        if completed:
-            df = pd.DataFrame(completed, columns=["Code", "SKU", "Units Sold", "Expected", "Revenue", "Margin %", "Created"])
-            df["Performance %"] = (df["Units Sold"] / df["Expected"] * 100).round(1)
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No completed promotions")
-
-    with tab3:
-        st.subheader("Retracted Promotions")
-        cursor.execute("""
-            SELECT
-                p.promotion_code,
-                s.name as sku,
-                p.retraction_reason,
-                p.actual_units_sold,
-                p.expected_units_sold,
-                p.retracted_at
-            FROM promotions p
-            JOIN skus s ON p.sku_id = s.id
-            WHERE p.status = 'retracted'
-            ORDER BY p.retracted_at DESC
-            LIMIT 20
-        """)
-        retracted = cursor.fetchall()
-
-        if retracted:
-            df = pd.DataFrame(retracted, columns=["Code", "SKU", "Reason", "Units Sold", "Expected", "Retracted At"])
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No retracted promotions")
-
-    cursor.close()
-    conn.close()
+    with get_db_connection() as conn:
+        for name, order_by in PROMO_STATEMENTS.items():
+            prepare_once(conn, name, PROMO_BY_STATUS_SQL.format(name=name, order_by=order_by))
+        cursor = conn.cursor()
+
+        tab1, tab2, tab3 = st.tabs(["Active Promotions", "Completed Promotions", "Retracted Promotions"])
+
+        with tab1:
+            st.subheader("Active Promotions")
+            # Unlimited, so ending soonest first is a cheap client-side sort
+            active = promotions_by_status(cursor, "active").sort_values("Until", kind="stable", ignore_index=True)
+
+            if not active.empty:
+                df = active[["ID", "Code", "SKU", "Store", "Price", "From", "Until", "Sold", "Expected", "Revenue"]]
+                st.dataframe(df, use_container_width=True)
+            else:
+                st.info("No active promotions")
+
+        with tab2:
+            st.subheader("Completed Promotions")
+            completed = promotions_by_status(cursor, "completed", 20)
+
+            if not completed.empty:
+                df = completed[
+                    ["Code", "SKU", "Sold", "Expected", "Revenue", "Margin %", "Created", "Performance %"]
+                ].rename(columns={"Sold": "Units Sold"})
+                st.dataframe(df, use_container_width=True)
+            else:
+                st.info("No completed promotions")
+
+        with tab3:
+            st.subheader("Retracted Promotions")
+            retracted = promotions_by_status(cursor, "retracted", 20, "promo_by_retracted")
+
+            if not retracted.empty:
+                df = retracted[["Code", "SKU", "Reason", "Sold", "Expected", "Retracted At"]].rename(
+                    columns={"Sold": "Units Sold"}
+                )
+                st.dataframe(df, use_container_width=True)
+            else:
+                st.info("No retracted promotions")
+
+        cursor.close()
 
 except Exception as e:
     st.error(f"Error: {e}")
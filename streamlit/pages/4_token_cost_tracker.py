@@ -1,33 +1,90 @@
 import streamlit as st
-import sys
-sys.path.append('..')
-from common import get_db_connection, render_sidebar
+from common import fetch_arrow, fetch_df, get_db_connection, render_sidebar
 import pandas as pd
+import pyarrow as pa
 import plotly.express as px
 
+CHART_CACHE_TTL_SECONDS = 60
+
+# All four headline metrics from one pass over token_usage
+TOKEN_SUMMARY_SQL = """
+SELECT
+    SUM(estimated_cost) FILTER (WHERE timestamp >= NOW() - INTERVAL '24 hours') as daily_cost,
+    SUM(estimated_cost) FILTER (WHERE timestamp >= NOW() - INTERVAL '7 days') as weekly_cost,
+    SUM(total_tokens) as total_tokens,
+    COUNT(DISTINCT agent_name) as agent_count
+FROM token_usage
+"""
+
+
+@st.cache_data(ttl=CHART_CACHE_TTL_SECONDS, show_spinner=False)
+def load_token_summary() -> tuple:
+    """(24h cost, 7d cost, total tokens, agent count), with NULLs as 0."""
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(TOKEN_SUMMARY_SQL)
+        return tuple(value or 0 for value in cursor.fetchone())
+
+
+@st.cache_data(ttl=CHART_CACHE_TTL_SECONDS, show_spinner=False)
+def load_agent_costs_7d() -> list:
+    """(agent, cost) rows over the last 7 days, highest cost first."""
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT agent_name, SUM(estimated_cost)::float8 as cost
+            FROM token_usage
+            WHERE timestamp >= NOW() - INTERVAL '7 days'
+            GROUP BY agent_name
+            ORDER BY cost DESC
+        """)
+        return cursor.fetchall()
+
+
+@st.cache_data(ttl=CHART_CACHE_TTL_SECONDS, show_spinner=False)
+def load_daily_costs() -> pd.DataFrame:
+    """Last 30 days of cost from the trigger-maintained daily rollup, idle days as 0."""
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        return fetch_df(cursor, """
+            SELECT d::date as usage_date, COALESCE(t.estimated_cost, 0) as estimated_cost
+            FROM generate_series(CURRENT_DATE - 30, CURRENT_DATE, INTERVAL '1 day') d
+            LEFT JOIN token_usage_daily t ON t.usage_date = d::date
+            ORDER BY 1
+        """, columns=["Date", "Cost"])
+
+
+@st.cache_data(ttl=CHART_CACHE_TTL_SECONDS, show_spinner=False)
+def build_daily_cost_fig(df: pd.DataFrame):
+    """Daily cost line chart, rebuilt only when the rollup rows change."""
+    return px.line(df, x="Date", y="Cost", title="Daily Cost Trend")
+
+
+@st.cache_data(ttl=CHART_CACHE_TTL_SECONDS, show_spinner=False)
+def load_recent_operations() -> pa.Table:
+    """Latest 50 token usage rows, as Arrow for st.dataframe."""
+    # Named cursor: rows stay server-side and are fetched in batches
+    with get_db_connection() as conn, conn.cursor(name="recent_operations") as cursor:
+        return fetch_arrow(cursor, """
+            SELECT
+                timestamp,
+                agent_name,
+                operation,
+                total_tokens,
+                estimated_cost
+            FROM token_usage
+            ORDER BY timestamp DESC
+            LIMIT 50
+        """, columns=["Timestamp", "Agent", "Operation", "Tokens", "Cost"])
+
+
 render_sidebar(show_navigation=False, key_prefix="token_tracker")
 
 st.title("💰 Token Usage & Cost Tracker")
 st.markdown("---")
 
 try:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     # Summary metrics
     col1, col2, col3, col4 = st.columns(4)
 
-    cursor.execute("SELECT SUM(estimated_cost) FROM token_usage WHERE timestamp >= NOW() - INTERVAL '24 hours'")
-    daily_cost = cursor.fetchone()[0] or 0
-
-    cursor.execute("SELECT SUM(estimated_cost) FROM token_usage WHERE timestamp >= NOW() - INTERVAL '7 days'")
-    weekly_cost = cursor.fetchone()[0] or 0
-
-    cursor.execute("SELECT SUM(total_tokens) FROM token_usage")
-    total_tokens = cursor.fetchone()[0] or 0
-
-    cursor.execute("SELECT COUNT(DISTINCT agent_name) FROM token_usage")
-    agent_count = cursor.fetchone()[0] or 0
+    daily_cost, weekly_cost, total_tokens, agent_count = load_token_summary()
 
     with col1:
         st.metric("24h Cost", f"${daily_cost:.4f}")
@@ -48,63 +105,29 @@ try:
 
     with col1:
         st.subheader("Cost by Agent (Last 7 Days)")
-        cursor.execute("""
-            SELECT
-                agent_name,
-                SUM(estimated_cost) as cost,
-                COUNT(*) as operations,
-                SUM(total_tokens) as tokens
-            FROM token_usage
-            WHERE timestamp >= NOW() - INTERVAL '7 days'
-            GROUP BY agent_name
-            ORDER BY cost DESC
-        """)
-        agent_costs = cursor.fetchall()
+        agent_costs = load_agent_costs_7d()
 
         if agent_costs:
-            df = pd.DataFrame(agent_costs, columns=["Agent", "Cost", "Operations", "Tokens"])
-            fig = px.bar(df, x="Agent", y="Cost", title="Cost by Agent")
+            agents, costs = zip(*agent_costs)
+            fig = px.bar(x=agents, y=costs, labels={"x": "Agent", "y": "Cost"}, title="Cost by Agent")
             st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("Cost Over Time")
-        cursor.execute("""
-            SELECT
-                DATE(timestamp) as date,
-                SUM(estimated_cost) as cost
-            FROM token_usage
-            WHERE timestamp >= NOW() - INTERVAL '30 days'
-            GROUP BY DATE(timestamp)
-            ORDER BY date
-        """)
-        daily_costs = cursor.fetchall()
+        df = load_daily_costs()
 
-        if daily_costs:
-            df = pd.DataFrame(daily_costs, columns=["Date", "Cost"])
-            fig = px.line(df, x="Date", y="Cost", title="Daily Cost Trend")
-            st.plotly_chart(fig, use_container_width=True)
+        # generate_series always yields every day, so check for any non-zero cost
+        if df["Cost"].any():
+            st.plotly_chart(build_daily_cost_fig(df), use_container_width=True)
+        else:
+            st.info("No token usage in the last 30 days")
 
     # Recent operations
     st.subheader("Recent Operations")
-    cursor.execute("""
-        SELECT
-            timestamp,
-            agent_name,
-            operation,
-            total_tokens,
-            estimated_cost
-        FROM token_usage
-        ORDER BY timestamp DESC
-        LIMIT 50
-    """)
-    recent = cursor.fetchall()
-
-    if recent:
-        df = pd.DataFrame(recent, columns=["Timestamp", "Agent", "Operation", "Tokens", "Cost"])
-        st.dataframe(df, use_container_width=True)
-
-    cursor.close()
-    conn.close()
+    recent_ops = load_recent_operations()
+
+    if recent_ops.num_rows:
+        st.dataframe(recent_ops, use_container_width=True)
 
 except Exception as e:
     st.error(f"Error: {e}")
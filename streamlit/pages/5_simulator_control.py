@@ -1,11 +1,11 @@
 import streamlit as st
-import httpx
-import sys
-sys.path.append('..')
-from common import render_sidebar
+from common import get_http_client, render_sidebar
 
 render_sidebar(show_navigation=False, key_prefix="simulator_control")
 
+# Process-wide keep-alive client; repeat clicks reuse each simulator's connection
+http_client = get_http_client()
+
 st.title("🎮 Simulator Control Panel")
 st.markdown("---")
 
@@ -23,7 +23,7 @@ with tab1:
 
         if st.button("Get Current Weather"):
             try:
-                response = httpx.get(f"http://mcp-weather:3001/weather/{location_id}", timeout=10.0)
+                response = http_client.get(f"http://mcp-weather:3001/weather/{location_id}", timeout=10.0)
                 if response.status_code == 200:
                     data = response.json()
                     st.json(data)
@@ -43,7 +43,7 @@ with tab1:
 
         if st.button("Apply Scenario"):
             try:
-                response = httpx.post(
+                response = http_client.post(
                     f"http://mcp-weather:3001/scenario?location_id={scenario_location}&scenario={scenario}",
                     timeout=10.0
                 )
@@ -66,7 +66,7 @@ with tab2:
 
         if st.button("Get Prices"):
             try:
-                response = httpx.get(f"http://mcp-competitor:3002/prices/{sku_id}", timeout=10.0)
+                response = http_client.get(f"http://mcp-competitor:3002/prices/{sku_id}", timeout=10.0)
                 if response.status_code == 200:
                     data = response.json()
                     for comp in data:
@@ -89,7 +89,7 @@ with tab2:
 
         if st.button("Trigger Promotion"):
             try:
-                response = httpx.post(
+                response = http_client.post(
                     f"http://mcp-competitor:3002/promotion/trigger?competitor_name={competitor}&sku_id={promo_sku}&discount_percent={discount}",
                     timeout=10.0
                 )
@@ -111,7 +111,7 @@ with tab3:
 
         if st.button("Get Trending"):
             try:
-                response = httpx.get("http://mcp-social:3003/trending", timeout=10.0)
+                response = http_client.get("http://mcp-social:3003/trending", timeout=10.0)
                 if response.status_code == 200:
                     data = response.json()
                     for trend in data[:5]:
@@ -129,7 +129,7 @@ with tab3:
 
         if st.button("Inject Viral Moment"):
             try:
-                response = httpx.post(
+                response = http_client.post(
                     f"http://mcp-social:3003/viral?topic={topic}&intensity={intensity}",
                     timeout=10.0
                 )
@@ -144,7 +144,7 @@ with tab3:
     st.write("**Upcoming Events**")
     if st.button("Get Events"):
         try:
-            response = httpx.get("http://mcp-social:3003/events?days_ahead=7", timeout=10.0)
+            response = http_client.get("http://mcp-social:3003/events?days_ahead=7", timeout=10.0)
             if response.status_code == 200:
                 data = response.json()
                 for event in data[:10]:
@@ -1,90 +1,88 @@
 import streamlit as st
-import sys
-sys.path.append('..')
-from common import get_db_connection, render_sidebar
-import pandas as pd
+from common import fetch_arrow, get_db_connection, render_sidebar
+import pyarrow as pa
 import plotly.express as px
 
+CHART_CACHE_TTL_SECONDS = 60
+# Distributions only move when promotions finish
+DISTRIBUTION_CACHE_TTL_SECONDS = 300
+
+
+@st.cache_data(ttl=CHART_CACHE_TTL_SECONDS, show_spinner=False)
+def load_agent_decisions() -> pa.Table:
+    """Latest 20 agent decisions with a reasoning preview, as Arrow for st.dataframe."""
+    # Named cursor: rows stay server-side and are fetched in batches
+    with get_db_connection() as conn, conn.cursor(name="agent_decisions") as cursor:
+        return fetch_arrow(cursor, """
+            SELECT
+                created_at,
+                agent_name,
+                decision_type,
+                LEFT(reasoning, 100) as reasoning_preview,
+                decision_outcome
+            FROM agent_decisions
+            ORDER BY created_at DESC
+            LIMIT 20
+        """, columns=["Timestamp", "Agent", "Decision Type", "Reasoning", "Outcome"])
+
+
+@st.cache_data(ttl=DISTRIBUTION_CACHE_TTL_SECONDS, show_spinner=False)
+def load_promotion_distributions() -> dict:
+    """
+    Performance and margin (bucket, count) rows for completed/retracted promotions,
+    both read in one round trip from the single-scan view.
+    """
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT dimension, bucket, count FROM v_promo_distributions ORDER BY bucket DESC")
+        distributions = {"performance": [], "margin": []}
+        for dimension, bucket, count in cursor.fetchall():
+            distributions[dimension].append((bucket, count))
+        return distributions
+
+
 render_sidebar(show_navigation=False, key_prefix="analytics")
 
 st.title("📈 Analytics & Insights")
 st.markdown("---")
 
 try:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     # Agent Decisions
     st.subheader("Agent Decision Log")
-    cursor.execute("""
-        SELECT
-            created_at,
-            agent_name,
-            decision_type,
-            LEFT(reasoning, 100) as reasoning_preview,
-            decision_outcome
-        FROM agent_decisions
-        ORDER BY created_at DESC
-        LIMIT 20
-    """)
-    decisions = cursor.fetchall()
-
-    if decisions:
-        df = pd.DataFrame(decisions, columns=["Timestamp", "Agent", "Decision Type", "Reasoning", "Outcome"])
-        st.dataframe(df, use_container_width=True)
+    decisions = load_agent_decisions()
+
+    if decisions.num_rows:
+        st.dataframe(decisions, use_container_width=True)
     else:
         st.info("No agent decisions logged yet")
 
     st.markdown("---")
 
     # Promotion Performance Analysis
+    distributions = load_promotion_distributions()
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Promotion Performance Distribution")
-        cursor.execute("""
-            SELECT
-                CASE
-                    WHEN (actual_units_sold::float / NULLIF(expected_units_sold, 0)) >= 1.5 THEN 'Excellent (150%+)'
-                    WHEN (actual_units_sold::float / NULLIF(expected_units_sold, 0)) >= 1.0 THEN 'Good (100-150%)'
-                    WHEN (actual_units_sold::float / NULLIF(expected_units_sold, 0)) >= 0.7 THEN 'Acceptable (70-100%)'
-                    ELSE 'Poor (<70%)'
-                END as performance_category,
-                COUNT(*) as count
-            FROM promotions
-            WHERE status IN ('completed', 'retracted')
-              AND expected_units_sold > 0
-            GROUP BY performance_category
-        """)
-        perf_dist = cursor.fetchall()
+        perf_dist = distributions["performance"]
 
         if perf_dist:
-            df = pd.DataFrame(perf_dist, columns=["Performance", "Count"])
-            fig = px.pie(df, values="Count", names="Performance", title="Performance Distribution")
+            # A handful of buckets: hand plotly the columns directly rather than a DataFrame
+            categories, counts = zip(*perf_dist)
+            fig = px.pie(values=counts, names=categories, title="Performance Distribution")
             st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("Margin Distribution")
-        cursor.execute("""
-            SELECT
-                CASE
-                    WHEN margin_percent >= 25 THEN '25%+'
-                    WHEN margin_percent >= 20 THEN '20-25%'
-                    WHEN margin_percent >= 15 THEN '15-20%'
-                    WHEN margin_percent >= 10 THEN '10-15%'
-                    ELSE '<10%'
-                END as margin_range,
-                COUNT(*) as count
-            FROM promotions
-            WHERE status IN ('completed', 'retracted')
-            GROUP BY margin_range
-            ORDER BY margin_range DESC
-        """)
-        margin_dist = cursor.fetchall()
+        margin_dist = distributions["margin"]
 
         if margin_dist:
-            df = pd.DataFrame(margin_dist, columns=["Margin Range", "Count"])
-            fig = px.bar(df, x="Margin Range", y="Count", title="Margin Distribution")
+            margin_ranges, counts = zip(*margin_dist)
+            fig = px.bar(
+                x=margin_ranges,
+                y=counts,
+                labels={"x": "Margin Range", "y": "Count"},
+                title="Margin Distribution",
+            )
             st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
@@ -124,7 +122,6 @@ try:
     #     st.info("No ROI data available yet")
 
     # cursor.close()
-    # conn.close()
 
 except Exception as e:
     st.error(f"Error: {e}")
@@ -4,12 +4,10 @@ Manual approval interface for pending promotions
 """
 
 import streamlit as st
-import requests
+import httpx
 import json
 from datetime import datetime
-import sys
-sys.path.append('..')
-from common import render_sidebar
+from common import get_http_client, render_sidebar
 
 render_sidebar(show_navigation=False, key_prefix="approval_queue")
 
@@ -20,26 +18,315 @@ st.markdown("Review and approve/reject agent-recommended promotions")
 MCP_POSTGRES_URL = "http://mcp-postgres:3000"
 
 
-def call_mcp_tool(tool_name: str, parameters: dict):
-    """Call MCP Postgres tool"""
+MCP_READ_CACHE_TTL_SECONDS = 30
+PROMOTION_STATUSES = ("pending", "approved", "rejected")
+# Promotions reviewed since the snapshot was fetched (id -> "approved"/"rejected")
+REVIEWED_KEY = "reviewed_promotions"
+# Outcome of the latest review, shown once above the queue
+QUEUE_NOTICE_KEY = "queue_notice"
+
+
+class MCPToolError(Exception):
+    """The MCP server answered but reported the tool call as failed."""
+
+
+def _post_tool(tool_name: str, parameters: dict):
+    """POST a tool call and return its data, raising on transport or tool failure."""
+    response = get_http_client().post(
+        f"{MCP_POSTGRES_URL}/tool",
+        json={"tool_name": tool_name, "parameters": parameters},
+        timeout=10.0,
+    )
+    return _tool_data(response)
+
+
+def _tool_data(response: httpx.Response):
+    """Unwrap a /tool response, raising on HTTP or tool failure."""
+    response.raise_for_status()
+    result = response.json()
+    if not result.get("success"):
+        raise MCPToolError(result.get("error"))
+    return result.get("data")
+
+
+@st.cache_data(ttl=MCP_READ_CACHE_TTL_SECONDS, show_spinner=False)
+def _cached_tool(tool_name: str, params_json: str):
+    """Memoized read-only tool call; failures raise, so they are never cached."""
+    return _post_tool(tool_name, json.loads(params_json))
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _parse_market_data(raw: str):
+    """Decode a market_data JSON string once per distinct payload."""
+    return json.loads(raw)
+
+
+def _clear_mcp_cache():
+    """Drop memoized reads after a refresh or a review action."""
+    _cached_tool.clear()
+
+
+def call_mcp_tool(tool_name: str, parameters: dict, cached: bool = False):
+    """Call MCP Postgres tool; read-only calls may pass cached=True to reuse recent results"""
     try:
-        response = requests.post(
-            f"{MCP_POSTGRES_URL}/tool",
-            json={"tool_name": tool_name, "parameters": parameters},
-            timeout=10,
-        )
-        response.raise_for_status()
-        result = response.json()
-        if result.get("success"):
-            return result.get("data")
-        else:
-            st.error(f"Tool error: {result.get('error')}")
-            return None
+        if cached:
+            return _cached_tool(tool_name, json.dumps(parameters, sort_keys=True))
+        return _post_tool(tool_name, parameters)
+    except MCPToolError as e:
+        st.error(f"Tool error: {e}")
+        return None
     except Exception as e:
         st.error(f"Failed to call MCP tool: {str(e)}")
         return None
 
 
+def _submit_review(promotion_id: int, action: str):
+    """
+    Approve/reject form callback. It runs before the card re-renders, reading the
+    form fields from session state, so the outcome shows without a forced rerun.
+    """
+    review_key = f"promo_review_{promotion_id}"
+    if action == "approve":
+        reviewed_by = st.session_state.get(f"approve_name_{promotion_id}")
+        notes = st.session_state.get(f"approve_notes_{promotion_id}")
+        if not reviewed_by:
+            st.session_state[review_key] = ("error", "Please enter your name")
+            return
+    else:
+        reviewed_by = st.session_state.get(f"reject_name_{promotion_id}")
+        notes = st.session_state.get(f"reject_reason_{promotion_id}")
+        if not reviewed_by:
+            st.session_state[review_key] = ("error", "Please enter your name")
+            return
+        if not notes:
+            st.session_state[review_key] = ("error", "Please provide a rejection reason")
+            return
+
+    try:
+        result = _post_tool(
+            f"{action}_promotion",
+            {
+                "pending_promotion_id": promotion_id,
+                "reviewed_by": reviewed_by,
+                "reviewer_notes": notes if notes else None,
+            },
+        )
+    except MCPToolError as e:
+        st.session_state[review_key] = ("error", f"Tool error: {e}")
+        return
+    except Exception as e:
+        st.session_state[review_key] = ("error", f"Failed to call MCP tool: {str(e)}")
+        return
+
+    if action == "approve":
+        st.session_state[QUEUE_NOTICE_KEY] = (
+            "approved",
+            f"✅ Promotion {promotion_id} approved! Created promotion {result['promotion_code']}",
+        )
+    else:
+        st.session_state[QUEUE_NOTICE_KEY] = ("rejected", f"❌ Promotion {promotion_id} rejected")
+    st.session_state[REVIEWED_KEY][promotion_id] = st.session_state[QUEUE_NOTICE_KEY][0]
+    _clear_mcp_cache()
+
+
+def _promotion_label(promo: dict) -> str:
+    """Header shared by the open card and the collapsed summary rows."""
+    return (
+        f"🎯 {promo['sku_name']} @ {promo['store_name']} - "
+        f"${float(promo['promotional_price']):.2f} (ID: {promo['id']})"
+    )
+
+
+def _open_promotion(open_key: str, promotion_id: int):
+    """Summary-row callback: make this promotion the one rendered in full."""
+    st.session_state[open_key] = promotion_id
+
+
+def render_promotion(promo: dict):
+    """Full card for the open promotion: details, review errors and approve/reject forms."""
+    # Validation/tool errors are shown once, next to the forms
+    review = st.session_state.pop(f"promo_review_{promo['id']}", None)
+
+    with st.expander(_promotion_label(promo), expanded=True):
+        # Promotion Details
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.markdown("**📦 Product Info**")
+            st.write(f"**SKU:** {promo['sku_code']}")
+            st.write(f"**Category:** {promo['category']}")
+            st.write(f"**Store:** {promo['store_code']}")
+
+        with col2:
+            st.markdown("**💰 Pricing**")
+            st.write(f"**Original Price:** ${float(promo['original_price']):.2f}")
+            st.write(f"**Promo Price:** ${float(promo['promotional_price']):.2f}")
+            st.write(f"**Discount:** {float(promo['discount_value']):.2f}%")
+            st.write(f"**Margin:** {float(promo['margin_percent']):.2f}%")
+
+        with col3:
+            st.markdown("**📅 Timing**")
+            st.write(f"**Type:** {promo['promotion_type']}")
+            st.write(f"**Start:** {promo['proposed_valid_from']}")
+            st.write(f"**End:** {promo['proposed_valid_until']}")
+            st.write(f"**Created:** {promo['created_at']}")
+
+        # Expected Performance
+        st.markdown("**📊 Expected Performance**")
+        perf_col1, perf_col2 = st.columns(2)
+        with perf_col1:
+            st.metric("Expected Units Sold", promo.get('expected_units_sold', 'N/A'))
+        with perf_col2:
+            st.metric("Expected Revenue", f"${float(promo.get('expected_revenue', 0)):.2f}" if promo.get('expected_revenue') else 'N/A')
+
+        # Agent Reasoning
+        st.markdown("**🤖 Agent Reasoning**")
+        st.info(promo['agent_reasoning'])
+
+        # Market Data (if available)
+        if promo.get('market_data'):
+            st.markdown("**📈 Market Data**")
+            if st.checkbox("Show Market Data Details", key=f"market_data_{promo['id']}"):
+                try:
+                    market_data = _parse_market_data(promo['market_data']) if isinstance(promo['market_data'], str) else promo['market_data']
+                    st.json(market_data)
+                except:
+                    st.write(promo['market_data'])
+
+        # Status and Review Info
+        st.markdown("**📋 Status**")
+        status_col1, status_col2, status_col3 = st.columns(3)
+        with status_col1:
+            status_color = {
+                "pending": "🟡",
+                "approved": "🟢",
+                "rejected": "🔴"
+            }
+            st.write(f"**Status:** {status_color.get(promo['status'], '⚪')} {promo['status'].upper()}")
+
+        with status_col2:
+            if promo.get('reviewed_by'):
+                st.write(f"**Reviewed By:** {promo['reviewed_by']}")
+
+        with status_col3:
+            if promo.get('reviewed_at'):
+                st.write(f"**Reviewed At:** {promo['reviewed_at']}")
+
+        if promo.get('reviewer_notes'):
+            st.markdown("**📝 Reviewer Notes**")
+            st.write(promo['reviewer_notes'])
+
+        # Approval Actions (only for pending promotions)
+        if promo['status'] == 'pending':
+            st.markdown("---")
+            st.markdown("**✅ Approval Actions**")
+            if review:
+                st.error(review[1])
+
+            action_col1, action_col2 = st.columns(2)
+
+            with action_col1:
+                with st.form(key=f"approve_form_{promo['id']}"):
+                    st.markdown("**Approve Promotion**")
+                    st.text_input("Your Name", key=f"approve_name_{promo['id']}")
+                    st.text_area("Notes (optional)", key=f"approve_notes_{promo['id']}")
+                    st.form_submit_button(
+                        "✅ Approve",
+                        type="primary",
+                        use_container_width=True,
+                        on_click=_submit_review,
+                        args=(promo['id'], "approve"),
+                    )
+
+            with action_col2:
+                with st.form(key=f"reject_form_{promo['id']}"):
+                    st.markdown("**Reject Promotion**")
+                    st.text_input("Your Name", key=f"reject_name_{promo['id']}")
+                    st.text_area("Rejection Reason (required)", key=f"reject_reason_{promo['id']}")
+                    st.form_submit_button(
+                        "❌ Reject",
+                        type="secondary",
+                        use_container_width=True,
+                        on_click=_submit_review,
+                        args=(promo['id'], "reject"),
+                    )
+
+
+def render_statistics(status_counts: dict):
+    """Per-status metrics and the approval rate."""
+    st.markdown("---")
+    st.subheader("📊 Approval Queue Statistics")
+
+    stats_col1, stats_col2, stats_col3 = st.columns(3)
+
+    pending_count = status_counts.get("pending", 0)
+    approved_count = status_counts.get("approved", 0)
+    rejected_count = status_counts.get("rejected", 0)
+
+    with stats_col1:
+        st.metric("🟡 Pending", pending_count)
+
+    with stats_col2:
+        st.metric("🟢 Approved", approved_count)
+
+    with stats_col3:
+        st.metric("🔴 Rejected", rejected_count)
+
+    # Total
+    total = pending_count + approved_count + rejected_count
+    if total > 0:
+        approval_rate = (approved_count / total) * 100
+        st.info(f"**Approval Rate:** {approval_rate:.1f}% ({approved_count}/{total})")
+
+
+@st.fragment
+def render_queue(snapshot: dict, status_filter: str):
+    """
+    Only the open promotion is built in full; the rest are one-line summary buttons,
+    so the page payload scales with what is shown rather than the queue length.
+    Opening another promotion or submitting a review reruns just this fragment:
+    reviewed promotions drop out of the list and the counts are adjusted locally.
+    """
+    reviewed = st.session_state[REVIEWED_KEY]
+    notice = st.session_state.pop(QUEUE_NOTICE_KEY, None)
+    if notice:
+        if notice[0] == "approved":
+            st.success(notice[1])
+            st.balloons()
+        else:
+            st.warning(notice[1])
+
+    promotions = [promo for promo in snapshot.get("rows") or [] if promo['id'] not in reviewed]
+
+    if not promotions:
+        st.info(f"No {status_filter} promotions found.")
+    else:
+        st.success(f"Found {len(promotions)} {status_filter} promotion(s)")
+
+        open_key = f"open_promotion_{status_filter}"
+        # Fall back to the current first pending row when the open one has left the list
+        if st.session_state.get(open_key) not in {promo['id'] for promo in promotions}:
+            st.session_state[open_key] = promotions[0]['id'] if status_filter == "pending" else None
+
+        for promo in promotions:
+            if promo['id'] == st.session_state[open_key]:
+                render_promotion(promo)
+            else:
+                st.button(
+                    _promotion_label(promo),
+                    key=f"open_promo_{promo['id']}",
+                    use_container_width=True,
+                    on_click=_open_promotion,
+                    args=(open_key, promo['id']),
+                )
+
+    status_counts = dict(snapshot.get("counts") or {})
+    for outcome in reviewed.values():
+        status_counts["pending"] = max(status_counts.get("pending", 0) - 1, 0)
+        status_counts[outcome] = status_counts.get(outcome, 0) + 1
+    render_statistics(status_counts)
+
+
 # Fetch pending promotions
 st.subheader("Pending Promotions")
 
@@ -47,177 +334,21 @@ col1, col2 = st.columns([3, 1])
 with col1:
     status_filter = st.selectbox(
         "Status Filter",
-        options=["pending", "approved", "rejected"],
+        options=list(PROMOTION_STATUSES),
         index=0,
     )
 
 with col2:
-    if st.button("🔄 Refresh", use_container_width=True):
-        st.rerun()
-
-# Get pending promotions
-pending_promotions = call_mcp_tool(
-    "get_pending_promotions",
-    {"status": status_filter}
-)
-
-if not pending_promotions:
-    st.info(f"No {status_filter} promotions found.")
-else:
-    st.success(f"Found {len(pending_promotions)} {status_filter} promotion(s)")
-
-    for idx, promo in enumerate(pending_promotions):
-        with st.expander(
-            f"🎯 {promo['sku_name']} @ {promo['store_name']} - "
-            f"${float(promo['promotional_price']):.2f} (ID: {promo['id']})",
-            expanded=(idx == 0 and status_filter == "pending")
-        ):
-            # Promotion Details
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                st.markdown("**📦 Product Info**")
-                st.write(f"**SKU:** {promo['sku_code']}")
-                st.write(f"**Category:** {promo['category']}")
-                st.write(f"**Store:** {promo['store_code']}")
-
-            with col2:
-                st.markdown("**💰 Pricing**")
-                st.write(f"**Original Price:** ${float(promo['original_price']):.2f}")
-                st.write(f"**Promo Price:** ${float(promo['promotional_price']):.2f}")
-                st.write(f"**Discount:** {float(promo['discount_value']):.2f}%")
-                st.write(f"**Margin:** {float(promo['margin_percent']):.2f}%")
-
-            with col3:
-                st.markdown("**📅 Timing**")
-                st.write(f"**Type:** {promo['promotion_type']}")
-                st.write(f"**Start:** {promo['proposed_valid_from']}")
-                st.write(f"**End:** {promo['proposed_valid_until']}")
-                st.write(f"**Created:** {promo['created_at']}")
-
-            # Expected Performance
-            st.markdown("**📊 Expected Performance**")
-            perf_col1, perf_col2 = st.columns(2)
-            with perf_col1:
-                st.metric("Expected Units Sold", promo.get('expected_units_sold', 'N/A'))
-            with perf_col2:
-                st.metric("Expected Revenue", f"${float(promo.get('expected_revenue', 0)):.2f}" if promo.get('expected_revenue') else 'N/A')
-
-            # Agent Reasoning
-            st.markdown("**🤖 Agent Reasoning**")
-            st.info(promo['agent_reasoning'])
-
-            # Market Data (if available)
-            if promo.get('market_data'):
-                st.markdown("**📈 Market Data**")
-                if st.checkbox("Show Market Data Details", key=f"market_data_{promo['id']}"):
-                    try:
-                        market_data = json.loads(promo['market_data']) if isinstance(promo['market_data'], str) else promo['market_data']
-                        st.json(market_data)
-                    except:
-                        st.write(promo['market_data'])
-
-            # Status and Review Info
-            st.markdown("**📋 Status**")
-            status_col1, status_col2, status_col3 = st.columns(3)
-            with status_col1:
-                status_color = {
-                    "pending": "🟡",
-                    "approved": "🟢",
-                    "rejected": "🔴"
-                }
-                st.write(f"**Status:** {status_color.get(promo['status'], '⚪')} {promo['status'].upper()}")
-
-            with status_col2:
-                if promo.get('reviewed_by'):
-                    st.write(f"**Reviewed By:** {promo['reviewed_by']}")
-
-            with status_col3:
-                if promo.get('reviewed_at'):
-                    st.write(f"**Reviewed At:** {promo['reviewed_at']}")
-
-            if promo.get('reviewer_notes'):
-                st.markdown("**📝 Reviewer Notes**")
-                st.write(promo['reviewer_notes'])
-
-            # Approval Actions (only for pending promotions)
-            if promo['status'] == 'pending':
-                st.markdown("---")
-                st.markdown("**✅ Approval Actions**")
-
-                action_col1, action_col2 = st.columns(2)
-
-                with action_col1:
-                    with st.form(key=f"approve_form_{promo['id']}"):
-                        st.markdown("**Approve Promotion**")
-                        reviewed_by = st.text_input("Your Name", key=f"approve_name_{promo['id']}")
-                        reviewer_notes = st.text_area("Notes (optional)", key=f"approve_notes_{promo['id']}")
-
-                        if st.form_submit_button("✅ Approve", type="primary", use_container_width=True):
-                            if not reviewed_by:
-                                st.error("Please enter your name")
-                            else:
-                                result = call_mcp_tool(
-                                    "approve_promotion",
-                                    {
-                                        "pending_promotion_id": promo['id'],
-                                        "reviewed_by": reviewed_by,
-                                        "reviewer_notes": reviewer_notes if reviewer_notes else None,
-                                    }
-                                )
-
-                                if result:
-                                    st.success(f"✅ Promotion approved! Created promotion {result['promotion_code']}")
-                                    st.balloons()
-                                    st.rerun()
-
-                with action_col2:
-                    with st.form(key=f"reject_form_{promo['id']}"):
-                        st.markdown("**Reject Promotion**")
-                        reviewed_by_reject = st.text_input("Your Name", key=f"reject_name_{promo['id']}")
-                        rejection_reason = st.text_area("Rejection Reason (required)", key=f"reject_reason_{promo['id']}")
-
-                        if st.form_submit_button("❌ Reject", type="secondary", use_container_width=True):
-                            if not reviewed_by_reject:
-                                st.error("Please enter your name")
-                            elif not rejection_reason:
-                                st.error("Please provide a rejection reason")
-                            else:
-                                result = call_mcp_tool(
-                                    "reject_promotion",
-                                    {
-                                        "pending_promotion_id": promo['id'],
-                                        "reviewed_by": reviewed_by_reject,
-                                        "reviewer_notes": rejection_reason,
-                                    }
-                                )
-
-                                if result:
-                                    st.success("❌ Promotion rejected")
-                                    st.rerun()
-
-# Statistics
-st.markdown("---")
-st.subheader("📊 Approval Queue Statistics")
-
-stats_col1, stats_col2, stats_col3 = st.columns(3)
-
-# Get counts for all statuses
-pending_count = len(call_mcp_tool("get_pending_promotions", {"status": "pending"}) or [])
-approved_count = len(call_mcp_tool("get_pending_promotions", {"status": "approved"}) or [])
-rejected_count = len(call_mcp_tool("get_pending_promotions", {"status": "rejected"}) or [])
-
-with stats_col1:
-    st.metric("🟡 Pending", pending_count)
-
-with stats_col2:
-    st.metric("🟢 Approved", approved_count)
-
-with stats_col3:
-    st.metric("🔴 Rejected", rejected_count)
-
-# Total
-total = pending_count + approved_count + rejected_count
-if total > 0:
-    approval_rate = (approved_count / total) * 100
-    st.info(f"**Approval Rate:** {approval_rate:.1f}% ({approved_count}/{total})")
+    st.button("🔄 Refresh", use_container_width=True, on_click=_clear_mcp_cache)
+
+# Get the filtered promotions and the per-status counts in one call
+snapshot = call_mcp_tool(
+    "get_queue_snapshot",
+    {"status": status_filter},
+    cached=True,
+) or {}
+# A full run reads a snapshot fetched after any earlier review (reviews clear the
+# cache), so local adjustments only apply to fragment reruns from here on
+st.session_state[REVIEWED_KEY] = {}
+
+render_queue(snapshot, status_filter)